@@ -46,21 +46,44 @@ def generate_barcode(existingBarcodes: list[str] = []):
         if barcode in existingBarcodes:
             new_barcode += 1
             continue
-        try:
-            ProductVariant.objects.get(barcode=barcode)
-            new_barcode += 1
-        except:
+        if not ProductVariant.objects.filter(barcode=barcode).exists():
             break
+        new_barcode += 1
     print(f"{(new_barcode):08d}")
     return f"{(new_barcode):08d}"
 
 
+def generate_barcodes(count, existingBarcodes: list[str] = []):
+    """Generate several unused barcodes, checking each block of candidates in one query"""
+    from catalog.models import ProductVariant
+    if count <= 0:
+        return []
+    try:
+        next_barcode = int(
+            ProductVariant.objects.order_by(
+            '-id'
+            ).first().barcode
+        ) + 1
+    except (ValueError, AttributeError):
+        next_barcode = 1
+
+    barcodes = []
+    while len(barcodes) < count:
+        candidates = []
+        while len(candidates) < count - len(barcodes):
+            barcode = f"{next_barcode:08d}"
+            if barcode not in existingBarcodes:
+                candidates.append(barcode)
+            next_barcode += 1
+        taken = set(ProductVariant.objects.filter(
+            barcode__in=candidates
+        ).values_list('barcode', flat=True))
+        barcodes.extend(b for b in candidates if b not in taken)
+    return barcodes
+
+
 def check_barcode(barcode):
 
     from catalog.models import ProductVariant
     
-    try:
-        ProductVariant.objects.get(barcode=barcode)
-        return False
-    except:
-        return True
\ No newline at end of file
+    return not ProductVariant.objects.filter(barcode=barcode).exists()
\ No newline at end of file
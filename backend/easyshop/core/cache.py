@@ -0,0 +1,34 @@
+# core/cache.py
+
+from django.core.cache import cache
+
+
+def _version_key(prefix, tenant_id):
+    return f"{prefix}:{tenant_id}:ver"
+
+
+def versioned_cache_key(prefix, tenant_id, name, *parts):
+    """Build a cache key scoped to the tenant's current version under prefix"""
+    version = cache.get(_version_key(prefix, tenant_id), 1)
+    suffix = ':'.join(str(part) for part in parts)
+    return f"{prefix}:{tenant_id}:v{version}:{name}:{suffix}"
+
+
+def get_or_set_versioned(prefix, tenant_id, name, parts, compute, timeout):
+    """Return a cached value, computing and storing it on a miss"""
+    key = versioned_cache_key(prefix, tenant_id, name, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def invalidate_versioned(prefix, tenant_id):
+    """Move the tenant to a new cache version so stale entries under prefix are never read"""
+    key = _version_key(prefix, tenant_id)
+    if not cache.add(key, 2, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
@@ -222,19 +222,30 @@ class Currency(TenantBaseModel):
         return converted_amount
 
     @classmethod
-    def convert_to_base_currency(cls, amount, from_currency_id):
-        base_currency = cls.get_base_currency()
+    def get_base_rates(cls, currency_ids):
+        """Map currency ids to their latest rate against the base currency.
+
+        The base currency and currencies without a rate are left out so
+        callers treat them as a 1:1 conversion.
+        """
+        base_currency_id = int(TenantSettings.objects.get(setting_key="base_currency_id").get_typed_value())
+        rates = {}
+        latest_rates = CurrencyRate.objects.filter(
+            currency_id__in=set(currency_ids) - {base_currency_id}
+        ).order_by('currency_id', '-effective_date').values_list('currency_id', 'rate')
+        for currency_id, rate in latest_rates:
+            rates.setdefault(currency_id, rate)
+        return rates
 
-        if base_currency.id == from_currency_id:
-            return amount
-        try:
-            from_currency = Currency.objects.get(id=from_currency_id)
-        except Currency.DoesNotExist:
+    @classmethod
+    def convert_to_base_currency(cls, amount, from_currency_id, rates=None):
+        """Convert amount to the base currency, reusing ``rates`` from get_base_rates when given"""
+        if rates is None:
+            rates = cls.get_base_rates([from_currency_id])
+        from_rate = rates.get(from_currency_id)
+        if not from_rate:
             return amount
-        
-        from_rate = from_currency.exchange_rate        
-        base_amount = amount / from_rate
-        return base_amount
+        return amount / from_rate
         
     @classmethod
     def get_base_currency(cls):
@@ -1,7 +1,15 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 class StandardResultsSetPagination(PageNumberPagination):
     """Standard pagination for high-volume models"""
     page_size = 25
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class PurchaseCursorPagination(CursorPagination):
+    """Keyset pagination for purchase lists; deep pages cost the same as the first"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-purchase_date', '-id')
@@ -0,0 +1,30 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def loads(data):
+    """Parse a JSON str/bytes with orjson when it is installed"""
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer that encodes with orjson when it is installed"""
+
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        # Indented (browsable/debug) output keeps the stdlib path
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Types orjson can't encode natively (Decimal, lazy strings, ...) go through
+        # DRF's encoder so the output matches the default renderer
+        return orjson.dumps(data, default=self.encoder_class().default, option=self.options)
@@ -1,6 +1,11 @@
+import json
+from datetime import datetime, time, timedelta
 from decimal import Decimal
+from time import monotonic
+from django.db import IntegrityError, transaction
 from .models import CurrencyRate
-from django.utils.timezone import now
+from django.utils.timezone import make_aware, now
+from rest_framework.utils.encoders import JSONEncoder
 
 def get_exchange_rate(currency_id, target_date):
     """
@@ -28,4 +33,62 @@ def get_cached_exchange_rate(currency_id, date):
     cache_key = f"{currency_id}_{date}"
     if cache_key not in exchange_rate_cache:
         exchange_rate_cache[cache_key] = get_exchange_rate(currency_id, date)
-    return exchange_rate_cache[cache_key]
\ No newline at end of file
+    return exchange_rate_cache[cache_key]
+
+
+NUMBERING_ATTEMPTS = 5
+
+
+def save_with_number(instance, field_name, generate_number, save, on_conflict=None):
+    """Assign a generated document number and save, retrying if a concurrent save took it"""
+    for attempt in range(NUMBERING_ATTEMPTS):
+        number = generate_number()
+        setattr(instance, field_name, number)
+        try:
+            # Savepoint so a duplicate number doesn't break the caller's transaction
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            setattr(instance, field_name, '')
+            # Any other constraint failure won't be fixed by a fresh number
+            taken = type(instance).all_objects.filter(
+                tenant_id=instance.tenant_id, **{field_name: number}
+            ).exists()
+            if not taken or attempt == NUMBERING_ATTEMPTS - 1:
+                raise
+            if on_conflict:
+                on_conflict()
+
+
+def day_start(day):
+    """Aware start of a date in the current timezone, for index-friendly datetime ranges"""
+    return make_aware(datetime.combine(day, time.min))
+
+
+def day_range(first_day, last_day):
+    """[start, end) datetime bounds covering first_day through last_day inclusive"""
+    return day_start(first_day), day_start(last_day + timedelta(days=1))
+
+
+MONTH_START_TTL = 60
+_month_cache = {}
+
+
+def month_start():
+    """Start of the current month, recomputed at most once a minute per process"""
+    checked = monotonic()
+    entry = _month_cache.get('value')
+    if entry and checked - entry[0] < MONTH_START_TTL:
+        return entry[1]
+    start = now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    _month_cache['value'] = (checked, start)
+    return start
+
+
+def stream_json_array(items):
+    """Yield a JSON array one encoded item at a time, for StreamingHttpResponse"""
+    yield '['
+    for index, item in enumerate(items):
+        yield (',' if index else '') + json.dumps(item, cls=JSONEncoder)
+    yield ']'
@@ -76,12 +76,7 @@ class CustomerStatementSerializer(serializers.ModelSerializer):
         customer.balance += base_amount
         customer.save()
         if cash_drawer and currency:
-            drawer_money, _ = CashDrawerMoney.objects.get_or_create(
-                cash_drawer=cash_drawer,
-                currency=currency,
-            )
-            drawer_money.amount += amount
-            drawer_money.save()
+            CashDrawerMoney.adjust(cash_drawer.pk, currency.pk, amount)
 
         return statement
 
@@ -291,11 +291,10 @@ class CustomerViewSet(TenantPermissionMixin, ModelViewSet):
             'total_customers': queryset.count(),
             'active_customers': queryset.filter(status='active').count(),
             'new_customers_this_month': queryset.filter(created_at__gte=month_start).count(),
+            # Balance is negative here, so ABS(balance) > credit_limit is balance < -credit_limit
             'customers_over_credit_limit': queryset.filter(
-                balance__lt=0,
+                balance__lt=-F('credit_limit'),
                 credit_limit__gt=0
-            ).extra(
-                where=["ABS(balance) > credit_limit"]
             ).count(),
             'total_customer_balance': queryset.aggregate(
                 total=Sum('balance')
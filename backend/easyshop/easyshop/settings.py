@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from datetime import timedelta
 from pathlib import Path
+import importlib.util
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -56,6 +57,18 @@ INSTALLED_APPS = [
     'hr',
 ]
 
+# Optional ORM query cache for read-mostly tables (vendors, purchases, ...).
+# It is only enabled when django-cachalot is installed. Invalidation goes
+# through CACHES, so use a shared cache backend when running several workers.
+if importlib.util.find_spec('cachalot'):
+    INSTALLED_APPS.append('cachalot')
+    # Frequently written tables cost more to invalidate than caching saves
+    CACHALOT_UNCACHABLE_TABLES = frozenset((
+        'django_migrations',
+        'purchase_items',
+        'stock_movements',
+    ))
+
 MIDDLEWARE = [
     'core.middleware.TenantMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from decimal import Decimal
@@ -66,6 +66,19 @@ class CashDrawerMoney(models.Model):
     def __str__(self):
         return f"{self.cash_drawer.name} - {self.currency.code}: {self.amount}"
 
+    @classmethod
+    def adjust(cls, cash_drawer_id, currency_id, delta):
+        """Add delta to the drawer's balance in one UPDATE, creating the row if missing"""
+        balance = cls.objects.filter(cash_drawer_id=cash_drawer_id, currency_id=currency_id)
+        if balance.update(amount=models.F('amount') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(cash_drawer_id=cash_drawer_id, currency_id=currency_id, amount=delta)
+        except IntegrityError:
+            # A concurrent request created the row first
+            balance.update(amount=models.F('amount') + delta)
+
 
 class Payment(TenantBaseModel):
     """Payment records for sales, purchases, expenses"""
@@ -149,6 +162,17 @@ class Payment(TenantBaseModel):
         
         return f'PAY-{date_str}-{new_seq:04d}'
 
+    @classmethod
+    def bulk_create_numbered(cls, payments, batch_size=500):
+        """Assign consecutive payment numbers and create payments in bulk"""
+        unnumbered = [payment for payment in payments if not payment.payment_number]
+        if unnumbered:
+            # bulk_create skips save(), so number the whole batch from the next free number
+            prefix, first_seq = unnumbered[0].generate_payment_number().rsplit('-', 1)
+            for offset, payment in enumerate(unnumbered):
+                payment.payment_number = f'{prefix}-{int(first_seq) + offset:04d}'
+        return cls.objects.bulk_create(payments, batch_size=batch_size)
+
 
 class Transaction(TenantBaseModel):
     """General ledger transactions"""
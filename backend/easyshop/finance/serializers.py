@@ -158,18 +158,12 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
         currency = validated_data["currency"]
         is_income = tx_type == "income"
 
-        drawer_money, _ = CashDrawerMoney.objects.get_or_create(
-            cash_drawer=drawer,
-            currency=currency,
-        )
-
         if is_income:
             amount = validated_data["amount"]
         else:
             amount = -validated_data["amount"]
 
-        drawer_money.amount += amount
-        drawer_money.save()
+        CashDrawerMoney.adjust(drawer.pk, currency.pk, amount)
 
         amount = Currency.convert_to_base_currency(amount, validated_data['currency'].pk)
         
@@ -333,13 +327,7 @@ class ExpenseSerializer(serializers.ModelSerializer):
         currency = expense.currency
         amount = expense.amount
         
-        drawer_money, _ = CashDrawerMoney.objects.get_or_create(
-            cash_drawer=drawer,
-            currency=currency,
-        )
-        
-        drawer_money.amount -= amount
-        drawer_money.save()
+        CashDrawerMoney.adjust(drawer.pk, currency.pk, -amount)
         return expense
 
     
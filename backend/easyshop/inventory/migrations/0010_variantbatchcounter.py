@@ -0,0 +1,37 @@
+# Generated by Django 5.0.2 on 2026-10-15 10:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """Start each variant's counter at its existing batch count so new numbers don't collide"""
+    ProductBatch = apps.get_model('inventory', 'ProductBatch')
+    VariantBatchCounter = apps.get_model('inventory', 'VariantBatchCounter')
+    counts = ProductBatch.objects.values('variant_id').annotate(total=models.Count('id'))
+    VariantBatchCounter.objects.bulk_create(
+        [VariantBatchCounter(variant_id=row['variant_id'], seq=row['total']) for row in counts],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0023_rename_reference_id_barcodes_object_id_and_more'),
+        ('inventory', '0009_remove_productbatch_product_bat_expiry__977560_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VariantBatchCounter',
+            fields=[
+                ('variant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='batch_counter', serialize=False, to='catalog.productvariant')),
+                ('seq', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'variant_batch_counters',
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
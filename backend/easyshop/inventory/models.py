@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from core.models import TenantBaseModel, BaseModel, Currency
@@ -87,6 +89,36 @@ class ProductBatch(TenantBaseModel):
         return None
 
 
+class VariantBatchCounter(models.Model):
+    """Last generated batch sequence per variant, bumped atomically"""
+    variant = models.OneToOneField(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='batch_counter'
+    )
+    seq = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'variant_batch_counters'
+
+    def __str__(self):
+        return f"{self.variant_id} - {self.seq}"
+
+    @classmethod
+    def reserve(cls, variant_id, count=1):
+        """Advance the variant's batch sequence by count and return the last reserved value"""
+        with transaction.atomic():
+            updated = cls.objects.filter(variant_id=variant_id).update(seq=F('seq') + count)
+            if not updated:
+                counter, created = cls.objects.get_or_create(variant_id=variant_id, defaults={'seq': count})
+                if created:
+                    return counter.seq
+                # Another request created the row in between
+                cls.objects.filter(variant_id=variant_id).update(seq=F('seq') + count)
+            return cls.objects.filter(variant_id=variant_id).values_list('seq', flat=True).get()
+
+
 class Inventory(TenantBaseModel):
     variant = models.ForeignKey(
         ProductVariant,
@@ -230,14 +262,59 @@ class StockMovement(TenantBaseModel):
             # Update inventory automatically
             self.update_inventory()
 
+    @classmethod
+    def bulk_create_with_inventory(cls, movements, batch_size=500):
+        """Create movements in bulk and apply their quantities to inventory"""
+        movements = cls.objects.bulk_create(movements, batch_size=batch_size)
+        
+        # bulk_create skips save(), so apply the summed deltas per inventory row
+        deltas = {}
+        for movement in movements:
+            key = (movement.tenant_id, movement.variant_id, movement.batch_id, movement.location_id)
+            deltas[key] = deltas.get(key, Decimal('0')) + movement.quantity
+        if not deltas:
+            return movements
+        
+        lookup = Q()
+        for tenant_id, variant_id, batch_id, location_id in deltas:
+            lookup |= Q(
+                tenant_id=tenant_id, variant_id=variant_id,
+                batch_id=batch_id, location_id=location_id
+            )
+        existing = {
+            (tenant_id, variant_id, batch_id, location_id): pk
+            for pk, tenant_id, variant_id, batch_id, location_id in Inventory.objects.filter(
+                lookup
+            ).values_list('id', 'tenant_id', 'variant_id', 'batch_id', 'location_id')
+        }
+        
+        Inventory.objects.bulk_create([
+            Inventory(
+                tenant_id=tenant_id, variant_id=variant_id,
+                batch_id=batch_id, location_id=location_id,
+                quantity_on_hand=delta
+            )
+            for (tenant_id, variant_id, batch_id, location_id), delta in deltas.items()
+            if (tenant_id, variant_id, batch_id, location_id) not in existing
+        ])
+        if existing:
+            Inventory.objects.filter(pk__in=existing.values()).update(
+                quantity_on_hand=F('quantity_on_hand') + Case(
+                    *[When(pk=pk, then=Value(deltas[key])) for key, pk in existing.items()],
+                    output_field=models.DecimalField(max_digits=15, decimal_places=4)
+                ),
+                updated_at=timezone.now()
+            )
+        return movements
+
     def update_inventory(self):
         """Update inventory record based on this movement"""
         try:
             inventory, created = Inventory.objects.get_or_create(
-                tenant=self.tenant,
-                variant=self.variant,
-                batch=self.batch,
-                location=self.location,
+                tenant_id=self.tenant_id,
+                variant_id=self.variant_id,
+                batch_id=self.batch_id,
+                location_id=self.location_id,
                 defaults={'quantity_on_hand': Decimal('0')}
             )
             
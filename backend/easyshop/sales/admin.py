@@ -68,7 +68,7 @@ class SaleItemInline(admin.TabularInline):
     fields = ('product', 'quantity', 'unit_price', 'discount_amount', 'line_total')
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('product')
+        return super().get_queryset(request).with_related()
 
 
 @admin.register(Sales)
@@ -204,7 +204,7 @@ class SaleItemAdmin(admin.ModelAdmin):
     raw_id_fields = ['sale', 'inventory']
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('sale', 'product')
+        return super().get_queryset(request).with_related().select_related('sale')
     
     def sale_link(self, obj):
         """Link to sale detail page"""
@@ -293,7 +293,7 @@ class ReturnAdmin(admin.ModelAdmin):
     ordering = ['-return_date']
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
+        return super().get_queryset(request).with_totals().select_related(
             'customer', 'original_sale', 'currency', 'processed_by_user'
         ).prefetch_related('return_items')
     
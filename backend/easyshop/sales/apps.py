@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SalesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sales'
+
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        import sales.signals
@@ -0,0 +1,40 @@
+# sales/cache.py
+
+from django.core.cache import cache
+
+from core.cache import get_or_set_versioned, invalidate_versioned, versioned_cache_key
+
+
+DASHBOARD_TODAY_TIMEOUT = 60
+DASHBOARD_PERIOD_TIMEOUT = 300
+DASHBOARD_PREFIX = 'sales:dash'
+
+
+def dashboard_cache_key(tenant_id, name, *parts):
+    """Build a dashboard cache key scoped to the tenant's current cache version"""
+    return versioned_cache_key(DASHBOARD_PREFIX, tenant_id, name, *parts)
+
+
+def get_or_set_dashboard(tenant_id, name, parts, compute, timeout):
+    """Return a cached dashboard value, computing and storing it on a miss"""
+    return get_or_set_versioned(DASHBOARD_PREFIX, tenant_id, name, parts, compute, timeout)
+
+
+def get_or_set_dashboard_snapshot(tenant_id, name, parts, compute, timeout):
+    """Return a dashboard value that is only recomputed once its timeout expires.
+
+    Unlike get_or_set_dashboard, the key is not versioned, so sale writes do not
+    invalidate it and heavy aggregates are refreshed at most once per timeout.
+    """
+    suffix = ':'.join(str(part) for part in parts)
+    key = f"{DASHBOARD_PREFIX}:{tenant_id}:snapshot:{name}:{suffix}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def invalidate_dashboard(tenant_id):
+    """Move the tenant to a new cache version so stale dashboard entries are never read"""
+    invalidate_versioned(DASHBOARD_PREFIX, tenant_id)
@@ -131,14 +131,14 @@ class SalesFilter(django_filters.FilterSet):
     def filter_items_count_min(self, queryset, name, value):
         """Filter by minimum number of items"""
         return queryset.annotate(
-            items_count=models.Count('items')
-        ).filter(items_count__gte=value)
+            _items_count=models.Count('items')
+        ).filter(_items_count__gte=value)
     
     def filter_items_count_max(self, queryset, name, value):
         """Filter by maximum number of items"""
         return queryset.annotate(
-            items_count=models.Count('items')
-        ).filter(items_count__lte=value)
+            _items_count=models.Count('items')
+        ).filter(_items_count__lte=value)
 
 
 class ReturnsFilter(django_filters.FilterSet):
@@ -263,11 +263,11 @@ class ReturnsFilter(django_filters.FilterSet):
     def filter_items_count_min(self, queryset, name, value):
         """Filter by minimum number of items"""
         return queryset.annotate(
-            items_count=models.Count('items')
-        ).filter(items_count__gte=value)
+            _items_count=models.Count('items')
+        ).filter(_items_count__gte=value)
     
     def filter_items_count_max(self, queryset, name, value):
         """Filter by maximum number of items"""
         return queryset.annotate(
-            items_count=models.Count('items')
-        ).filter(items_count__lte=value)
\ No newline at end of file
+            _items_count=models.Count('items')
+        ).filter(_items_count__lte=value)
\ No newline at end of file
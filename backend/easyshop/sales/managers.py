@@ -0,0 +1,49 @@
+# sales/managers.py
+
+from django.db import models
+from django.db.models import Count, Sum
+from core.managers import TenantManager
+
+
+class SalesQuerySet(models.QuerySet):
+    """Custom queryset for Sales model"""
+
+    def list_queryset(self):
+        """Skip columns the list endpoints never render"""
+        # Items are loaded per page by Sales.prefetch_item_rows, which also
+        # provides items_count without a GROUP BY on the main query
+        return self.defer('notes')
+
+    def for_reporting(self, tenant_id):
+        """Bare tenant-scoped queryset for aggregate-only reports"""
+        return self.filter(tenant_id=tenant_id).select_related(None).prefetch_related(None)
+
+
+class SalesManager(TenantManager.from_queryset(SalesQuerySet)):
+    """Custom manager for Sales model"""
+
+
+class SaleItemQuerySet(models.QuerySet):
+    """Custom queryset for SaleItem model"""
+
+    def with_related(self):
+        """Join the inventory variant used to render sale items"""
+        return self.select_related('inventory__variant')
+
+
+SaleItemManager = models.Manager.from_queryset(SaleItemQuerySet)
+
+
+class ReturnsQuerySet(models.QuerySet):
+    """Custom queryset for Returns model"""
+
+    def with_totals(self):
+        """Annotate returns with their item count and total quantity being returned"""
+        return self.annotate(
+            _items_count=Count('items'),
+            _total_items=Sum('items__quantity_returned'),
+        )
+
+
+class ReturnsManager(TenantManager.from_queryset(ReturnsQuerySet)):
+    """Custom manager for Returns model"""
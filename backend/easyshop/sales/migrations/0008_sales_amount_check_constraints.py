@@ -0,0 +1,81 @@
+# Generated by Django 5.0.2 on 2026-10-14 19:32
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_delete_attribute'),
+        ('core', '0019_alter_permission_module'),
+        ('customers', '0017_delete_customergroup'),
+        ('inventory', '0009_remove_productbatch_product_bat_expiry__977560_idx_and_more'),
+        ('sales', '0007_alter_sales_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='returnitem',
+            name='refund_amount',
+            field=models.DecimalField(decimal_places=4, max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='returns',
+            name='total_refund_amount',
+            field=models.DecimalField(decimal_places=4, max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='saleitem',
+            name='discount_amount',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='saleitem',
+            name='line_total',
+            field=models.DecimalField(decimal_places=4, max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='saleitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=4, max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='sales',
+            name='discount_amount',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='sales',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='sales',
+            name='tax_amount',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='sales',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.AddConstraint(
+            model_name='returnitem',
+            constraint=models.CheckConstraint(check=models.Q(('refund_amount__gte', 0)), name='return_items_refund_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='returns',
+            constraint=models.CheckConstraint(check=models.Q(('total_refund_amount__gte', 0)), name='returns_refund_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='saleitem',
+            constraint=models.CheckConstraint(check=models.Q(('unit_price__gte', 0), ('line_total__gte', 0), ('discount_amount__gte', 0)), name='sale_items_amounts_nonneg'),
+        ),
+        migrations.AddConstraint(
+            model_name='sales',
+            constraint=models.CheckConstraint(check=models.Q(('subtotal__gte', 0), ('discount_amount__gte', 0), ('tax_amount__gte', 0), ('total_amount__gte', 0)), name='sales_amounts_nonneg'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.2 on 2026-10-14 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_sales_amount_check_constraints'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='returnitem',
+            name='return_item_return__6161e3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='returnitem',
+            name='return_item_variant_c7d676_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='returns',
+            name='returns_return__51ce63_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='saleitem',
+            name='sale_items_sale_id_caf625_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='saleitem',
+            name='sale_items_invento_3d937b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sales',
+            name='sales_tenant__50a291_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sales',
+            name='sales_tenant__46b0ea_idx',
+        ),
+        migrations.AlterField(
+            model_name='returns',
+            name='return_date',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='returns',
+            name='return_number',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='returns',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('processed', 'Processed'), ('cancelled', 'Cancelled')], default='pending', max_length=20),
+        ),
+    ]
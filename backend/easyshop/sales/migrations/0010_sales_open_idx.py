@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-14 19:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_alter_permission_module'),
+        ('customers', '0017_delete_customergroup'),
+        ('sales', '0009_remove_redundant_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(condition=models.Q(('payment_status__in', ['pending', 'partial'])), fields=['tenant', '-sale_date'], name='sales_open_idx'),
+        ),
+    ]
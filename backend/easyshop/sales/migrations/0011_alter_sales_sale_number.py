@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-14 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0010_sales_open_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sales',
+            name='sale_number',
+            field=models.CharField(editable=False, max_length=50),
+        ),
+    ]
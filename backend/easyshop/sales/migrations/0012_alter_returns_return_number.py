@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0011_alter_sales_sale_number'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='returns',
+            name='return_number',
+            field=models.CharField(editable=False, max_length=50, unique=True),
+        ),
+    ]
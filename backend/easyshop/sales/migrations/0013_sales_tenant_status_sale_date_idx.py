@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-15 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0012_alter_returns_return_number'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sales',
+            name='sales_tenant__c63ca3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['tenant', 'status', 'sale_date'], name='sales_tenant__446c05_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-15 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0013_sales_tenant_status_sale_date_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='returns',
+            name='returns_tenant__8a2c8b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='returns',
+            index=models.Index(fields=['tenant', 'status', 'return_date'], name='returns_tenant__4659e7_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-15 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('sales', '0014_returns_tenant_status_return_date_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='returns',
+            name='return_number',
+            field=models.CharField(editable=False, max_length=50),
+        ),
+        migrations.AlterUniqueTogether(
+            name='returns',
+            unique_together={('tenant', 'return_number')},
+        ),
+    ]
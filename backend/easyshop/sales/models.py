@@ -1,17 +1,24 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from core.models import TenantBaseModel
+from core.utils import save_with_number
 from customers.models import Customer
 from inventory.models import Inventory, Location, ProductBatch
 from catalog.models import Product, ProductVariant
 from core.models import Currency
 from accounts.models import User
+from finance.models import Payment
 from django.utils import timezone
+from .managers import SalesManager, SaleItemManager, ReturnsManager
+
 
 class Sales(TenantBaseModel):
     """Sales/Orders model"""
     
+    # Status values are stored as their string keys: the API, filters and
+    # reports exchange these values directly.
     PAYMENT_STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('partial', 'Partially Paid'),
@@ -29,7 +36,7 @@ class Sales(TenantBaseModel):
         ('returned', 'Returned'),
     ]
     
-    sale_number = models.CharField(max_length=50)
+    sale_number = models.CharField(max_length=50, editable=False)
     receipt_id = models.CharField(max_length=200)
     customer = models.ForeignKey(
         Customer, 
@@ -43,25 +50,21 @@ class Sales(TenantBaseModel):
     subtotal = models.DecimalField(
         max_digits=15, 
         decimal_places=4,
-        default=Decimal('0.00'),
-        validators=[MinValueValidator(Decimal('0.00'))]
+        default=Decimal('0.00')
     )
     discount_amount = models.DecimalField(
         max_digits=15, 
         decimal_places=4, 
-        default=Decimal('0.00'),
-        validators=[MinValueValidator(Decimal('0.00'))]
+        default=Decimal('0.00')
     )
     tax_amount = models.DecimalField(
         max_digits=15, 
         decimal_places=4, 
-        default=Decimal('0.00'),
-        validators=[MinValueValidator(Decimal('0.00'))]
+        default=Decimal('0.00')
     )
     total_amount = models.DecimalField(
         max_digits=15, 
         decimal_places=4,
-        validators=[MinValueValidator(Decimal('0.00'))],
         default=Decimal('0.00')
     )
     currency = models.ForeignKey(
@@ -86,6 +89,8 @@ class Sales(TenantBaseModel):
         related_name='created_sales'
     )
     
+    objects = SalesManager()
+    
     class Meta:
         db_table = 'sales'
         ordering = ['-sale_date', '-created_at']
@@ -93,37 +98,160 @@ class Sales(TenantBaseModel):
             ['tenant', 'receipt_id'],
             ['tenant', 'sale_number']            
         ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(subtotal__gte=0) & Q(discount_amount__gte=0)
+                & Q(tax_amount__gte=0) & Q(total_amount__gte=0),
+                name='sales_amounts_nonneg'
+            ),
+        ]
         indexes = [
             models.Index(fields=['tenant', 'sale_date']),
             models.Index(fields=['tenant', 'customer']),
-            models.Index(fields=['tenant', 'status']),
-            models.Index(fields=['tenant', 'receipt_id']),
+            models.Index(fields=['tenant', 'status', 'sale_date']),
             models.Index(fields=['tenant', 'payment_status']),
-            models.Index(fields=['tenant', 'sale_number']),
+            # Partial index over sales that still carry a balance
+            models.Index(
+                fields=['tenant', '-sale_date'],
+                condition=Q(payment_status__in=['pending', 'partial']),
+                name='sales_open_idx'
+            ),
         ]
     
     def __str__(self):
         return f"Sale {self.sale_number}"
     
+    def save(self, *args, **kwargs):
+        if self.sale_number:
+            super().save(*args, **kwargs)
+            return
+        save_with_number(
+            self, 'sale_number', self.generate_sale_number,
+            lambda: super(Sales, self).save(*args, **kwargs)
+        )
+    
+    def generate_sale_number(self):
+        """Generate the next sequential sale number for the tenant"""
+        # Include soft-deleted sales: their numbers are still unique per tenant
+        last_number = Sales.all_objects.filter(
+            tenant_id=self.tenant_id
+        ).order_by('-id').values_list('sale_number', flat=True).first()
+        
+        if last_number:
+            try:
+                return f"SALE-{int(last_number.split('-')[-1]) + 1:06d}"
+            except ValueError:
+                pass
+        return "SALE-000001"
+    
+    @property
+    def items_count(self):
+        """Get number of sale lines"""
+        if hasattr(self, '_prefetched_item_rows'):
+            return len(self._prefetched_item_rows)
+        if '_items_count' in self.__dict__:
+            return self._items_count
+        return self.items.count()
+    
     @property
     def paid_amount(self):
         """Calculate total paid amount from payments"""
-        from finance.models import Payment
-        
-        payments = Payment.objects.filter(
-            tenant=self.tenant,
-            reference_type='sale',
-            reference_id=self.id
-        )
+        if hasattr(self, '_prefetched_payments'):
+            payments = [
+                (payment.amount, payment.currency_id)
+                for payment in self._prefetched_payments
+            ]
+        else:
+            payments = Payment.objects.filter(
+                tenant_id=self.tenant_id,
+                reference_type='sale',
+                reference_id=self.id
+            ).values_list('amount', 'currency_id')
         paid = 0
         
-        for payment in payments:
-            p = self.currency.convert_from(payment.amount, payment.currency_id)
+        for amount, currency_id in payments:
+            p = self.currency.convert_from(amount, currency_id)
             # p_base = payment.amount / payment.currency.exchange_rate
             # p = p_base * self.currency.exchange_rate
             paid += p
         return paid
 
+    @classmethod
+    def prefetch_payments(cls, sales):
+        """Attach payments to each sale using a single query"""
+        sales = [sale for sale in sales if not hasattr(sale, '_prefetched_payments')]
+        if not sales:
+            return
+        
+        payments_by_sale = {sale.id: [] for sale in sales}
+        payments = Payment.objects.filter(
+            reference_type='sale',
+            reference_id__in=payments_by_sale.keys()
+        ).values_list(
+            'id', 'reference_id', 'amount', 'currency_id', 'cash_drawer_id', 'notes',
+            named=True
+        )
+        for payment in payments:
+            payments_by_sale[payment.reference_id].append(payment)
+        
+        for sale in sales:
+            sale._prefetched_payments = payments_by_sale[sale.id]
+
+    @classmethod
+    def prefetch_item_rows(cls, sales):
+        """Attach lightweight item rows to each sale using a single query"""
+        sales = [sale for sale in sales if not hasattr(sale, '_prefetched_item_rows')]
+        if not sales:
+            return
+        
+        rows_by_sale = {sale.id: [] for sale in sales}
+        rows = SaleItem.objects.filter(
+            sale_id__in=rows_by_sale.keys()
+        ).values(
+            'id', 'sale_id', 'inventory_id', 'inventory__variant__variant_name',
+            'quantity', 'unit_price', 'discount_amount', 'line_total'
+        )
+        for row in rows:
+            rows_by_sale[row['sale_id']].append(row)
+        
+        for sale in sales:
+            sale._prefetched_item_rows = rows_by_sale[sale.id]
+
+    @classmethod
+    def paid_amount_batch(cls, sale_ids):
+        """Calculate paid amounts for many sales with a single payments query"""
+        sales = cls.objects.filter(id__in=sale_ids).select_related('currency')
+        payments = Payment.objects.filter(
+            reference_type='sale',
+            reference_id__in=sale_ids
+        ).values_list('reference_id', 'amount', 'currency_id')
+
+        rates = {}
+
+        def get_rate(currency):
+            if currency.id not in rates:
+                rates[currency.id] = currency.exchange_rate
+            return rates[currency.id]
+
+        currencies = {sale.currency_id: sale.currency for sale in sales}
+        missing = {currency_id for _, _, currency_id in payments} - currencies.keys()
+        currencies.update(Currency.objects.in_bulk(missing))
+
+        paid = {sale.id: 0 for sale in sales}
+        sale_currency = {sale.id: sale.currency_id for sale in sales}
+
+        for sale_id, amount, currency_id in payments:
+            if sale_id not in paid:
+                continue
+            to_currency_id = sale_currency[sale_id]
+            if currency_id != to_currency_id and currency_id in currencies:
+                from_rate = get_rate(currencies[currency_id])
+                to_rate = get_rate(currencies[to_currency_id])
+                if from_rate is not None and to_rate is not None:
+                    amount = amount / from_rate * to_rate
+            paid[sale_id] += amount
+        return paid
+
     @property
     def balance_due(self):
         """Calculate remaining balance"""
@@ -135,14 +263,18 @@ class Sales(TenantBaseModel):
     
     def update_payment_status(self):
         """Update payment status based on payments"""
-        paid = self.paid_amount
-        if paid <= 0:
-            self.payment_status = 'pending'
-        elif paid >= self.total_amount:
-            self.payment_status = 'paid'
-        else:
-            self.payment_status = 'partial'
-        self.save(update_fields=['payment_status'])
+        with transaction.atomic():
+            # Lock the row so concurrent payments can't both write a stale status
+            locked = Sales.objects.select_for_update().get(pk=self.pk)
+            paid = locked.paid_amount
+            if paid <= 0:
+                payment_status = 'pending'
+            elif paid >= locked.total_amount:
+                payment_status = 'paid'
+            else:
+                payment_status = 'partial'
+            Sales.objects.filter(pk=self.pk).update(payment_status=payment_status)
+        self.payment_status = payment_status
 
 
 class SaleItem(models.Model):
@@ -166,36 +298,42 @@ class SaleItem(models.Model):
     )
     unit_price = models.DecimalField(
         max_digits=15, 
-        decimal_places=4,
-        validators=[MinValueValidator(Decimal('0.00'))]
+        decimal_places=4
     )
     line_total = models.DecimalField(
         max_digits=15, 
-        decimal_places=4,
-        validators=[MinValueValidator(Decimal('0.00'))]
+        decimal_places=4
     )
     discount_amount = models.DecimalField(
         max_digits=15, 
         decimal_places=4, 
-        default=Decimal('0.00'),
-        validators=[MinValueValidator(Decimal('0.00'))]
+        default=Decimal('0.00')
     )
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = SaleItemManager()
+    
     class Meta:
         db_table = 'sale_items'
-        indexes = [
-            models.Index(fields=['sale']),
-            models.Index(fields=['inventory']),
+        constraints = [
+            models.CheckConstraint(
+                check=Q(unit_price__gte=0) & Q(line_total__gte=0)
+                & Q(discount_amount__gte=0),
+                name='sale_items_amounts_nonneg'
+            ),
         ]
     
     def __str__(self):
-        return f"{self.variant.variant_name} - {self.quantity} @ {self.unit_price}"
+        return f"{self.inventory.variant.variant_name} - {self.quantity} @ {self.unit_price}"
     
     def save(self, *args, **kwargs):
         """Auto-calculate line_total on save"""
-        self.line_total = (self.quantity * self.unit_price) - self.discount_amount
+        self.calculate_line_total()
         super().save(*args, **kwargs)
+    
+    def calculate_line_total(self):
+        """Set line_total from quantity, price and discount (bulk_create skips save)"""
+        self.line_total = (self.quantity * self.unit_price) - self.discount_amount
 
 
 class Returns(TenantBaseModel):
@@ -218,7 +356,7 @@ class Returns(TenantBaseModel):
         ('other', 'Other'),
     ]
     
-    return_number = models.CharField(max_length=50, unique=True, db_index=True)
+    return_number = models.CharField(max_length=50, editable=False)
     original_sale = models.ForeignKey(
         Sales, 
         on_delete=models.PROTECT, 
@@ -231,12 +369,11 @@ class Returns(TenantBaseModel):
         null=True, 
         blank=True
     )
-    return_date = models.DateTimeField(db_index=True)
+    return_date = models.DateTimeField()
     reason = models.CharField(max_length=20, choices=REASON_CHOICES)
     total_refund_amount = models.DecimalField(
         max_digits=15, 
-        decimal_places=4,
-        validators=[MinValueValidator(Decimal('0.00'))]
+        decimal_places=4
     )
     currency = models.ForeignKey(
         Currency, 
@@ -246,8 +383,7 @@ class Returns(TenantBaseModel):
     status = models.CharField(
         max_length=20, 
         choices=STATUS_CHOICES, 
-        default='pending',
-        db_index=True
+        default='pending'
     )
     processed_by_user = models.ForeignKey(
         User, 
@@ -257,22 +393,61 @@ class Returns(TenantBaseModel):
         blank=True
     )
     
+    objects = ReturnsManager()
+    
     class Meta:
         db_table = 'returns'
         ordering = ['-return_date', '-created_at']
+        unique_together = ['tenant', 'return_number']
+        constraints = [
+            models.CheckConstraint(
+                check=Q(total_refund_amount__gte=0),
+                name='returns_refund_nonneg'
+            ),
+        ]
         indexes = [
             models.Index(fields=['tenant', 'return_date']),
             models.Index(fields=['tenant', 'customer']),
-            models.Index(fields=['tenant', 'status']),
-            models.Index(fields=['return_number']),
+            models.Index(fields=['tenant', 'status', 'return_date']),
         ]
     
     def __str__(self):
         return f"Return {self.return_number}"
     
+    def save(self, *args, **kwargs):
+        if self.return_number:
+            super().save(*args, **kwargs)
+            return
+        save_with_number(
+            self, 'return_number', self.generate_return_number,
+            lambda: super(Returns, self).save(*args, **kwargs)
+        )
+    
+    def generate_return_number(self):
+        """Generate the next sequential return number for the tenant"""
+        last_number = Returns.all_objects.filter(
+            tenant_id=self.tenant_id
+        ).order_by('-id').values_list('return_number', flat=True).first()
+        
+        if last_number:
+            try:
+                return f"RET-{int(last_number.split('-')[-1]) + 1:06d}"
+            except ValueError:
+                pass
+        return "RET-000001"
+    
+    @property
+    def items_count(self):
+        """Get number of return lines"""
+        if '_items_count' in self.__dict__:
+            return self._items_count
+        return self.items.count()
+    
     @property
     def total_items(self):
         """Get total number of items being returned"""
+        if '_total_items' in self.__dict__:
+            return self._total_items or 0
         return self.items.aggregate(
             total=models.Sum('quantity_returned')
         )['total'] or 0
@@ -319,17 +494,18 @@ class ReturnItem(models.Model):
     condition = models.CharField(max_length=20, choices=CONDITION_CHOICES)
     refund_amount = models.DecimalField(
         max_digits=15, 
-        decimal_places=4,
-        validators=[MinValueValidator(Decimal('0.00'))]
+        decimal_places=4
     )
     restocked = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'return_items'
-        indexes = [
-            models.Index(fields=['return_order']),
-            models.Index(fields=['variant']),
+        constraints = [
+            models.CheckConstraint(
+                check=Q(refund_amount__gte=0),
+                name='return_items_refund_nonneg'
+            ),
         ]
     
     def __str__(self):
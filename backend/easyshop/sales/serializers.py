@@ -1,17 +1,35 @@
+import operator
+
 from rest_framework import serializers
+from rest_framework.fields import Field, SkipField
+from rest_framework.relations import PKOnlyObject
 from django.db import transaction, models
+from django.utils import timezone
 from decimal import Decimal
 
 from core.models import Currency
-from customers.models import CustomerStatement
+from customers.models import Customer, CustomerStatement
 from finance.models import CashDrawer, CashDrawerMoney, Payment, Transaction
+from inventory.models import Inventory, StockMovement
 from .models import Sales, SaleItem, Returns, ReturnItem
 from django.core.validators import MinValueValidator
 
     
+class PreloadedInventoryField(serializers.PrimaryKeyRelatedField):
+    """Resolve inventory ids from the batch preloaded by SaleCreateUpdateSerializer"""
+    
+    def to_internal_value(self, data):
+        preloaded = self.context.get('_inventory_cache') or {}
+        try:
+            return preloaded[int(data)]
+        except (KeyError, TypeError, ValueError):
+            return super().to_internal_value(data)
+
+
 class SaleItemSerializer(serializers.ModelSerializer):
     """Serializer for sale items"""
     
+    inventory = PreloadedInventoryField(queryset=Inventory.objects.all())
     variant_name = serializers.CharField(source='inventory.variant.variant_name', read_only=True)
     unit_name = serializers.CharField(source='inventory.variant.product.base_unit.name', read_only=True)
     
@@ -23,6 +41,10 @@ class SaleItemSerializer(serializers.ModelSerializer):
             'discount_amount', 'created_at'
         ]
         read_only_fields = ['id', 'line_total', 'created_at']
+        extra_kwargs = {
+            'unit_price': {'min_value': Decimal('0.00')},
+            'discount_amount': {'min_value': Decimal('0.00')},
+        }
     
     def validate(self, attrs):
         """Validate sale item data"""
@@ -63,6 +85,22 @@ class SaleCreateUpdateSerializer(serializers.ModelSerializer):
             'discount_amount', 'tax_amount', 'payments',
             'currency', 'notes', 'items'
         ]
+        extra_kwargs = {
+            'discount_amount': {'min_value': Decimal('0.00')},
+            'tax_amount': {'min_value': Decimal('0.00')},
+        }
+    
+    def to_internal_value(self, data):
+        """Load every inventory referenced by the items in one query"""
+        inventory_ids = set()
+        items_data = data.get('items') if hasattr(data, 'get') else None
+        for item in items_data or []:
+            try:
+                inventory_ids.add(int(item['inventory']))
+            except (KeyError, TypeError, ValueError):
+                continue
+        self.context['_inventory_cache'] = Inventory.objects.in_bulk(inventory_ids)
+        return super().to_internal_value(data)
     
     def validate(self, attrs):
         """Validate sale data"""
@@ -82,45 +120,31 @@ class SaleCreateUpdateSerializer(serializers.ModelSerializer):
         items_data = validated_data.pop('items')
         payments = validated_data.pop("payments", [])
 
-        # Generate sale number
-        last_sale = Sales.objects.order_by('-id').first()
-        if last_sale:
-            last_number = int(last_sale.sale_number.split('-')[-1])
-            sale_number = f"SALE-{last_number + 1:06d}"
-        else:
-            sale_number = "SALE-000001"
-        
-        validated_data['sale_number'] = sale_number
-        
-        # Create sale
+        # Create sale (sale_number is assigned in Sales.save)
         sale = Sales.objects.create(**validated_data)
         
         # Create sale items and calculate totals
-        subtotal = Decimal('0.00')
-        total_discount = Decimal('0.00')
+        items = [SaleItem(sale=sale, **item_data) for item_data in items_data]
+        for item in items:
+            item.calculate_line_total()
+        SaleItem.objects.bulk_create(items, batch_size=500)
         
-        for item_data in items_data:
-            item_data['sale'] = sale
-            item = SaleItem.objects.create(**item_data)
-            subtotal += item.line_total
-            total_discount += item.discount_amount
+        subtotal = sum((item.line_total for item in items), Decimal('0.00'))
+        total_discount = sum((item.discount_amount for item in items), Decimal('0.00'))
         
         # Update sale totals
         sale.subtotal = subtotal
         sale.discount_amount = total_discount
         sale.total_amount = subtotal + sale.tax_amount
-        sale.save()
+        sale.save(update_fields=['subtotal', 'discount_amount', 'total_amount', 'updated_at'])
         
 
-        for payment in payments:
-            self._make_payment(payment, sale)
-        
-        sale.refresh_from_db()
+        self._make_payments(payments, sale)
 
         self._add_to_customer_account(sale)
         
         # Update inventory
-        self._update_inventory_on_sale(sale)
+        self._update_inventory_on_sale(sale, items=items)
         
         return sale
     
@@ -129,16 +153,23 @@ class SaleCreateUpdateSerializer(serializers.ModelSerializer):
         """Handle the update of a sale and its related items."""
         items_data = validated_data.pop('items', [])
         
+        # Load the current items once for both the inventory reversal and the update
+        current_items = list(instance.items.select_related('inventory').only(
+            'id', 'quantity', 'unit_price', 'discount_amount',
+            'inventory', 'inventory__variant', 'inventory__batch', 'inventory__location'
+        ))
+        
         # --- 1. Reverse Old Financial & Inventory State ---
         # Reverse the old customer balance entry before recalculating
         self._reverse_customer_account_update(instance)
         # Reverse old inventory movements before updating
-        self._reverse_inventory_update(instance)
+        self._reverse_inventory_update(instance, items=current_items)
 
         # --- 2. Update Sale Items ---
         # This logic handles adding, updating, and removing items
-        existing_items = {item.id: item for item in instance.items.all()}
-        updated_item_ids = set()
+        existing_items = {item.id: item for item in current_items}
+        updated_items = []
+        new_items = []
 
         for item_data in items_data:
             item_id = item_data.get('id')
@@ -149,14 +180,23 @@ class SaleCreateUpdateSerializer(serializers.ModelSerializer):
                 item.quantity = item_data.get('quantity', item.quantity)
                 item.unit_price = item_data.get('unit_price', item.unit_price)
                 item.discount_amount = item_data.get('discount_amount', item.discount_amount)
-                item.save()
-                updated_item_ids.add(item_id)
+                item.calculate_line_total()
+                updated_items.append(item)
             elif not item_id:
                 # Create new item
-                SaleItem.objects.create(sale=instance, **item_data)
+                item = SaleItem(sale=instance, **item_data)
+                item.calculate_line_total()
+                new_items.append(item)
+        
+        SaleItem.objects.bulk_update(
+            updated_items,
+            ['quantity', 'unit_price', 'discount_amount', 'line_total'],
+            batch_size=500
+        )
+        SaleItem.objects.bulk_create(new_items, batch_size=500)
 
         # Delete items that were removed from the request
-        items_to_delete_ids = set(existing_items.keys()) - updated_item_ids
+        items_to_delete_ids = set(existing_items.keys()) - {item.id for item in updated_items}
         if items_to_delete_ids:
             SaleItem.objects.filter(id__in=items_to_delete_ids).delete()
 
@@ -167,20 +207,20 @@ class SaleCreateUpdateSerializer(serializers.ModelSerializer):
         instance.tax_amount = validated_data.get('tax_amount', instance.tax_amount)
         # Other fields...
         
-        # Refresh instance to get the new set of items
-        instance.refresh_from_db()
-        
         # Recalculate totals from scratch based on the new state of items
-        subtotal = Decimal('0.00')
-        total_discount = Decimal('0.00')
-        for item in instance.items.all():
-            subtotal += item.line_total
-            total_discount += item.discount_amount
+        totals = instance.items.aggregate(
+            subtotal=models.Sum('line_total'),
+            discount=models.Sum('discount_amount'),
+        )
+        subtotal = totals['subtotal'] or Decimal('0.00')
             
         instance.subtotal = subtotal
-        instance.discount_amount = total_discount
+        instance.discount_amount = totals['discount'] or Decimal('0.00')
         instance.total_amount = subtotal + instance.tax_amount
-        instance.save()
+        instance.save(update_fields=[
+            'customer', 'notes', 'tax_amount',
+            'subtotal', 'discount_amount', 'total_amount', 'updated_at',
+        ])
         
         # --- 4. Apply New Financial & Inventory State ---
         # Update payment status and apply new balance to customer account
@@ -188,130 +228,147 @@ class SaleCreateUpdateSerializer(serializers.ModelSerializer):
         self._add_to_customer_account(instance) # Use your existing method
         
         # Create new stock movements for the final state of the sale
-        self._update_inventory_on_sale(instance)
+        self._update_inventory_on_sale(instance, items=updated_items + new_items)
         
-        instance.refresh_from_db()
         return instance
     
-    def _update_inventory_on_sale(self, sale):
+    def _update_inventory_on_sale(self, sale, items=None):
         """Update inventory when sale is created/confirmed"""
-        for item in sale.items.all():
-            
-            # Create stock movement
-            from inventory.models import StockMovement
-            StockMovement.objects.create(
-                tenant=sale.tenant,
-                variant=item.inventory.variant,
-                batch=item.inventory.batch,
-                location=item.inventory.location,
+        if items is None:
+            items = sale.items.select_related('inventory')
+        StockMovement.bulk_create_with_inventory([
+            StockMovement(
+                tenant_id=sale.tenant_id,
+                variant_id=item.inventory.variant_id,
+                batch_id=item.inventory.batch_id,
+                location_id=item.inventory.location_id,
                 movement_type='sale',
                 quantity=-item.quantity,
                 reference_type='sale',
                 reference_id=sale.id,
                 notes=f"Sale: {sale.sale_number}",
-                created_by_user=sale.created_by_user
+                created_by_user_id=sale.created_by_user_id
             )
+            for item in items
+        ])
     
-    def _make_payment(self, payment, sale):
-        """Create payment and update financial records"""
-
-        amount = payment.get('amount')
-        if amount <= 0:
-            raise serializers.ValidationError("Payment amount must be greater than 0")
-        
-
-        # Create payment record
-        payment = Payment.objects.create(
-            tenant=sale.tenant,
-            amount=payment.get('amount'),
-            currency=payment.get('currency'),
-            payment_method="cash",
-            reference_type='sale',
-            reference_id=sale.pk,
-            cash_drawer=payment.get('cash_drawer'),
-            notes=payment.get('notes', ''),
-            created_by_user=self.context['request'].user
-        )
-        
-        # Create transaction record for audit trail
-        Transaction.objects.create(
-            tenant=payment.tenant,
-            transaction_date=payment.payment_date,
-            amount=payment.amount,
-            currency=payment.currency,
-            description=f"Payment for Sale #{sale.sale_number}",
-            party_type='customer',
-            party_id=sale.customer.pk if sale.customer else None,
-            transaction_type='income' if type=="tender" else "expense",
-            reference_type='sale',
-            reference_id=sale.pk,
-            cash_drawer=payment.cash_drawer,
-            created_by_user=payment.created_by_user
-        )
-        if sale.customer:
-            CustomerStatement.objects.create(
-                tenant=payment.tenant,
-                customer=sale.customer,
+    def _make_payments(self, payments_data, sale):
+        """Create payments in bulk and update financial records"""
+        if not payments_data:
+            return
+        
+        user = self.context['request'].user
+        payments = []
+        for payment_data in payments_data:
+            amount = payment_data['amount']
+            if amount <= 0:
+                raise serializers.ValidationError("Payment amount must be greater than 0")
+            
+            payments.append(Payment(
+                tenant_id=sale.tenant_id,
+                amount=amount,
+                currency=payment_data['currency'],
+                payment_method="cash",
+                reference_type='sale',
+                reference_id=sale.pk,
+                cash_drawer=payment_data['cash_drawer'],
+                notes=payment_data.get('notes', ''),
+                created_by_user=user
+            ))
+        
+        # Create payment records
+        payments = Payment.bulk_create_numbered(payments)
+        
+        # Create transaction records for audit trail
+        Transaction.objects.bulk_create([
+            Transaction(
+                tenant_id=payment.tenant_id,
+                transaction_date=payment.payment_date,
                 amount=payment.amount,
-                currency=payment.currency,
-                statement_type="cash",
-                statement_date=payment.payment_date,
-                sale=sale,
-                cash_drawer=payment.cash_drawer,
-                notes=f"Statement for Sale #{sale.sale_number}",
-                created_by_user=payment.created_by_user,
-            )
-        
-        # Update cash drawer for cash payments
-        if payment.payment_method == 'cash' and payment.cash_drawer_id:
-            cash_drawer_money, _ = CashDrawerMoney.objects.get_or_create(
+                currency_id=payment.currency_id,
+                description=f"Payment for Sale #{sale.sale_number}",
+                party_type='customer',
+                party_id=sale.customer_id,
+                transaction_type='income',
+                reference_type='sale',
+                reference_id=sale.pk,
                 cash_drawer_id=payment.cash_drawer_id,
-                currency=payment.currency,
-                defaults={'amount': Decimal('0')}
+                created_by_user_id=payment.created_by_user_id
             )
-            cash_drawer_money.amount += payment.amount
-            cash_drawer_money.save()
+            for payment in payments
+        ], batch_size=500)
+        
+        if sale.customer_id:
+            CustomerStatement.objects.bulk_create([
+                CustomerStatement(
+                    tenant_id=payment.tenant_id,
+                    customer_id=sale.customer_id,
+                    amount=payment.amount,
+                    currency_id=payment.currency_id,
+                    statement_type="cash",
+                    statement_date=payment.payment_date,
+                    sale_id=sale.pk,
+                    cash_drawer_id=payment.cash_drawer_id,
+                    notes=f"Statement for Sale #{sale.sale_number}",
+                    created_by_user_id=payment.created_by_user_id,
+                )
+                for payment in payments
+            ], batch_size=500)
+        
+        # Update cash drawers once per drawer and currency
+        drawer_totals = {}
+        for payment in payments:
+            if payment.payment_method == 'cash' and payment.cash_drawer_id:
+                key = (payment.cash_drawer_id, payment.currency_id)
+                drawer_totals[key] = drawer_totals.get(key, Decimal('0')) + payment.amount
+        
+        for (cash_drawer_id, currency_id), amount in drawer_totals.items():
+            CashDrawerMoney.adjust(cash_drawer_id, currency_id, amount)
         
         # Update sale payment status
         sale.update_payment_status()
 
     def _add_to_customer_account(self, sale):
         remaining_payment = round(sale.balance_due, 2)
-        customer = sale.customer
-        if remaining_payment > 0 and customer:
-
+        if remaining_payment > 0 and sale.customer_id:
             remaining_payment_base = Currency.convert_to_base_currency(remaining_payment, sale.currency_id)
-            customer.balance -= remaining_payment_base
-            customer.save()   
+            # Adjust in SQL: on update, sale.customer may hold a balance read before the loan reversal
+            Customer.objects.filter(pk=sale.customer_id).update(
+                balance=models.F('balance') - remaining_payment_base,
+                updated_at=timezone.now()
+            )
         
             CustomerStatement.objects.create(
-                tenant=sale.tenant,
-                customer=sale.customer,
+                tenant_id=sale.tenant_id,
+                customer_id=sale.customer_id,
                 amount=remaining_payment,
-                currency=sale.currency,
+                currency_id=sale.currency_id,
                 statement_type="loan",
                 statement_date=sale.sale_date,
-                sale=sale,
+                sale_id=sale.pk,
                 notes=f"Loan for Sale #{sale.sale_number}",
-                created_by_user=sale.created_by_user,
+                created_by_user_id=sale.created_by_user_id,
             )
        
-    def _reverse_inventory_update(self, sale):
+    def _reverse_inventory_update(self, sale, items=None):
         """Create opposite stock movements to return items to inventory."""
-        from inventory.models import StockMovement
-        for item in sale.items.all():
-            StockMovement.objects.create(
-                tenant=sale.tenant,
-                variant=item.inventory.variant,
-                batch=item.inventory.batch,
-                location=item.inventory.location,
+        if items is None:
+            items = sale.items.select_related('inventory')
+        StockMovement.bulk_create_with_inventory([
+            StockMovement(
+                tenant_id=sale.tenant_id,
+                variant_id=item.inventory.variant_id,
+                batch_id=item.inventory.batch_id,
+                location_id=item.inventory.location_id,
                 movement_type='sale_return', # Use a distinct type
                 quantity=item.quantity, # Positive quantity to add it back
                 reference_type='sale',
                 reference_id=sale.id,
                 notes=f"Reversal for updating Sale: {sale.sale_number}",
-                created_by_user=sale.created_by_user
+                created_by_user_id=sale.created_by_user_id
             )
+            for item in items
+        ])
 
     def _reverse_customer_account_update(self, sale):
         """Reverse the original loan amount from the customer's account."""
@@ -321,33 +378,46 @@ class SaleCreateUpdateSerializer(serializers.ModelSerializer):
             statement_type="loan"
         ).first()
 
-        if original_loan and sale.customer:
+        if original_loan and sale.customer_id:
             # Convert the loan amount back to the base currency to reverse it
             loan_amount_base = Currency.convert_to_base_currency(
                 original_loan.amount, original_loan.currency_id
             )
-            sale.customer.balance += loan_amount_base
-            sale.customer.save()
+            Customer.objects.filter(pk=sale.customer_id).update(
+                balance=models.F('balance') + loan_amount_base,
+                updated_at=timezone.now()
+            )
             
             # It's often better to create a reversing entry than to delete
             CustomerStatement.objects.create(
-                tenant=sale.tenant,
-                customer=sale.customer,
+                tenant_id=sale.tenant_id,
+                customer_id=sale.customer_id,
                 amount=-original_loan.amount, # Negative amount
-                currency=original_loan.currency,
+                currency_id=original_loan.currency_id,
                 statement_type="reversal",
-                sale=sale,
+                sale_id=sale.pk,
                 notes=f"Reversal for updating Sale #{sale.sale_number}",
-                created_by_user=sale.created_by_user,
+                created_by_user_id=sale.created_by_user_id,
             )
             original_loan.delete() # Or mark as voided
          
 
+class SaleListBatchSerializer(serializers.ListSerializer):
+    """Load payments for the whole page of sales before rendering"""
+    
+    def to_representation(self, data):
+        sales = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        Sales.prefetch_payments(sales)
+        Sales.prefetch_item_rows(sales)
+        self.context['_base_rates'] = Currency.get_base_rates({sale.currency_id for sale in sales})
+        return super().to_representation(sales)
+
+
 class SaleListSerializer(serializers.ModelSerializer):
     """Simplified serializer for listing sales"""
     
     customer = serializers.SerializerMethodField()
-    items_count = serializers.IntegerField(source='items.count', read_only=True)
+    items_count = serializers.IntegerField(read_only=True)
     paid_amount = serializers.DecimalField(max_digits=15, decimal_places=4, read_only=True)
     balance_due = serializers.DecimalField(max_digits=15, decimal_places=4, read_only=True)
     
@@ -367,6 +437,41 @@ class SaleListSerializer(serializers.ModelSerializer):
             'sale_date', 'currency', 'payment_status', 'subtotal', 'total_amount', 'discount_amount',
             'status', 'type', 'items_count', 'paid_amount', 'balance_due', 'user', 'items', 'tenders',
         ]
+        list_serializer_class = SaleListBatchSerializer
+    
+    def _get_field_accessors(self):
+        """Resolve each readable field's accessor once; the list child renders every row"""
+        accessors = self.__dict__.get('_field_accessors')
+        if accessors is None:
+            accessors = self._field_accessors = [
+                (
+                    field,
+                    # Plain attribute sources skip Field.get_attribute's per-row source walk
+                    operator.attrgetter(field.source)
+                    if type(field).get_attribute is Field.get_attribute
+                    and field.source != '*' and '.' not in field.source
+                    else None
+                )
+                for field in self._readable_fields
+            ]
+        return accessors
+    
+    def to_representation(self, instance):
+        ret = {}
+        for field, getter in self._get_field_accessors():
+            if getter is not None:
+                attribute = getter(instance)
+            else:
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            if check_for_none is None:
+                ret[field.field_name] = None
+            else:
+                ret[field.field_name] = field.to_representation(attribute)
+        return ret
     
     def get_type(self, obj):
         """Return type of sale"""
@@ -387,42 +492,43 @@ class SaleListSerializer(serializers.ModelSerializer):
                 'id': obj.customer.id,
                 'name': obj.customer.name,
                 'balance': obj.customer.balance,
-                'added_to_account': Currency.convert_to_base_currency(obj.balance_due, obj.currency_id),
+                'added_to_account': Currency.convert_to_base_currency(
+                    obj.balance_due, obj.currency_id, rates=self.context.get('_base_rates')
+                ),
             }
         return None
 
     def get_items(self, obj):
         """Return items in a structured format"""
+        if not hasattr(obj, '_prefetched_item_rows'):
+            Sales.prefetch_item_rows([obj])
         return [
             {
-                'id': item.id,
-                'inventory': item.inventory.id,
-                'name': item.inventory.variant.variant_name,
-                'quantity': item.quantity,
-                'price': item.unit_price,
-                'discount': item.discount_amount,
-                'subtotal': item.line_total,
+                'id': item['id'],
+                'inventory': item['inventory_id'],
+                'name': item['inventory__variant__variant_name'],
+                'quantity': item['quantity'],
+                'price': item['unit_price'],
+                'discount': item['discount_amount'],
+                'subtotal': item['line_total'],
             }
-            for item in obj.items.all()
+            for item in obj._prefetched_item_rows
         ]
         
     
     def get_tenders(self, obj):
         """Return payment details in a structured format"""
-        payments = Payment.objects.filter(
-            tenant=obj.tenant,
-            reference_type='sale',
-            reference_id=obj.id
-        )
+        if not hasattr(obj, '_prefetched_payments'):
+            Sales.prefetch_payments([obj])
         return [
             {
                 'id': payment.id,
                 'amount': float(payment.amount),
-                'currency': payment.currency.id,
-                'cash_drawer': payment.cash_drawer.id if payment.cash_drawer else None,
+                'currency': payment.currency_id,
+                'cash_drawer': payment.cash_drawer_id,
                 'notes': payment.notes,
             }
-            for payment in payments.all()
+            for payment in obj._prefetched_payments
         ]
     
    
@@ -442,6 +548,9 @@ class ReturnItemSerializer(serializers.ModelSerializer):
             'condition', 'refund_amount', 'restocked', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        extra_kwargs = {
+            'refund_amount': {'min_value': Decimal('0.00')},
+        }
     
     def validate(self, attrs):
         """Validate return item"""
@@ -455,11 +564,15 @@ class ReturnItemSerializer(serializers.ModelSerializer):
             )
         
         # Check if item hasn't been fully returned already
-        total_returned = ReturnItem.objects.filter(
-            sale_item=sale_item
-        ).aggregate(
-            total=models.Sum('quantity_returned')
-        )['total'] or Decimal('0')
+        returned_totals = self.context.get('_returned_totals')
+        if returned_totals is not None and sale_item.id in returned_totals:
+            total_returned = returned_totals[sale_item.id]
+        else:
+            total_returned = ReturnItem.objects.filter(
+                sale_item=sale_item
+            ).aggregate(
+                total=models.Sum('quantity_returned')
+            )['total'] or Decimal('0')
         
         if total_returned + quantity_returned > sale_item.quantity:
             raise serializers.ValidationError(
@@ -492,6 +605,26 @@ class ReturnCreateUpdateSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
     
+    def to_internal_value(self, data):
+        """Load the already-returned quantity of every referenced sale item in one query"""
+        sale_item_ids = set()
+        items_data = data.get('items') if hasattr(data, 'get') else None
+        for item in items_data or []:
+            try:
+                sale_item_ids.add(int(item['sale_item']))
+            except (KeyError, TypeError, ValueError):
+                continue
+        returned_totals = dict.fromkeys(sale_item_ids, Decimal('0'))
+        returned_totals.update(
+            ReturnItem.objects.filter(
+                sale_item_id__in=sale_item_ids
+            ).values('sale_item_id').annotate(
+                total=models.Sum('quantity_returned')
+            ).values_list('sale_item_id', 'total')
+        )
+        self.context['_returned_totals'] = returned_totals
+        return super().to_internal_value(data)
+    
     def validate(self, attrs):
         """Validate return data"""
         original_sale = attrs.get('original_sale')
@@ -513,33 +646,18 @@ class ReturnCreateUpdateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create return with items"""
         items_data = validated_data.pop('items')
-        request = self.context['request']
-        tenant = request.user.tenant
-        
-        # Generate return number
-        last_return = Returns.objects.filter(tenant=tenant).order_by('-id').first()
-        if last_return:
-            last_number = int(last_return.return_number.split('-')[-1])
-            return_number = f"RET-{last_number + 1:06d}"
-        else:
-            return_number = "RET-000001"
-        
-        validated_data['return_number'] = return_number
         
-        # Create return
+        # Create return (return_number is assigned in Returns.save)
         return_order = Returns.objects.create(**validated_data)
         
         # Create return items and calculate total refund
-        total_refund = Decimal('0.00')
-        
-        for item_data in items_data:
-            item_data['return_order'] = return_order
-            item = ReturnItem.objects.create(**item_data)
-            total_refund += item.refund_amount
+        items = [ReturnItem(return_order=return_order, **item_data) for item_data in items_data]
+        ReturnItem.objects.bulk_create(items, batch_size=500)
+        total_refund = sum((item.refund_amount for item in items), Decimal('0.00'))
         
         # Update return total
         return_order.total_refund_amount = total_refund
-        return_order.save()
+        return_order.save(update_fields=['total_refund_amount', 'updated_at'])
         
         return return_order
     
@@ -557,12 +675,9 @@ class ReturnCreateUpdateSerializer(serializers.ModelSerializer):
             instance.items.all().delete()
             
             # Create new items
-            total_refund = Decimal('0.00')
-            
-            for item_data in items_data:
-                item_data['return_order'] = instance
-                item = ReturnItem.objects.create(**item_data)
-                total_refund += item.refund_amount
+            items = [ReturnItem(return_order=instance, **item_data) for item_data in items_data]
+            ReturnItem.objects.bulk_create(items, batch_size=500)
+            total_refund = sum((item.refund_amount for item in items), Decimal('0.00'))
             
             # Update total
             instance.total_refund_amount = total_refund
@@ -577,7 +692,7 @@ class ReturnListSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     sale_number = serializers.CharField(source='original_sale.sale_number', read_only=True)
     currency_code = serializers.CharField(source='currency.code', read_only=True)
-    items_count = serializers.IntegerField(source='items.count', read_only=True)
+    items_count = serializers.IntegerField(read_only=True)
     total_items = serializers.IntegerField(read_only=True)
     
     class Meta:
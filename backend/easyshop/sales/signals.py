@@ -0,0 +1,13 @@
+# sales/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_dashboard
+from .models import Sales
+
+
+@receiver([post_save, post_delete], sender=Sales)
+def invalidate_sales_dashboard(sender, instance, **kwargs):
+    """Drop cached dashboard figures when a tenant's sales change"""
+    invalidate_dashboard(instance.tenant_id)
@@ -1,3 +1,49 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from core.models import Tenant, TenantSettings, Currency
+from customers.models import Customer, CustomerStatement
+from inventory.models import Location
+from .models import Sales
+from .serializers import SaleCreateUpdateSerializer
+
+
+class SaleLoanUpdateTests(TestCase):
+    """Updating a sale reverses its old loan before booking the new one"""
+
+    def setUp(self):
+        tenant = Tenant.objects.create(name='Shop', contact_email='shop@example.com', status='active')
+        location = Location.objects.create(tenant=tenant, name='Main', address='Main street')
+        user = User.objects.create_user(
+            username='cashier', email='cashier@example.com', password='secret',
+            tenant=tenant, location=location
+        )
+        currency = Currency.objects.create(tenant=tenant, name='US Dollar', code='USD', is_base_currency=True)
+        TenantSettings.objects.create(
+            tenant=tenant, setting_key='base_currency_id',
+            setting_value=str(currency.id), setting_type='integer'
+        )
+        self.customer = Customer.objects.create(tenant=tenant, name='Ali', balance=Decimal('-28.00'))
+        # An unpaid 20.00 sale already booked as a loan on the customer's account
+        self.sale = Sales.objects.create(
+            tenant=tenant, receipt_id='R-1', customer=self.customer, currency=currency,
+            tax_amount=Decimal('20.00'), total_amount=Decimal('20.00'), created_by_user=user
+        )
+        CustomerStatement.objects.create(
+            tenant=tenant, customer=self.customer, amount=Decimal('20.00'), currency=currency,
+            statement_type='loan', sale=self.sale, created_by_user=user
+        )
+
+    def test_update_loan_sale(self):
+        # validated_data carries the customer as read during validation
+        stale_customer = Customer.objects.get(pk=self.customer.pk)
+        SaleCreateUpdateSerializer().update(self.sale, {
+            'items': [], 'customer': stale_customer, 'tax_amount': Decimal('11.00'),
+        })
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.balance, Decimal('-19.00'))
+        loan = CustomerStatement.objects.get(sale=self.sale, statement_type='loan')
+        self.assertEqual(loan.amount, Decimal('11.00'))
@@ -1,8 +1,10 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Count
+from django.db.models import Count, F, Prefetch, Q, Sum
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django.db import transaction
 from datetime import timedelta
@@ -10,7 +12,9 @@ from decimal import Decimal
 
 from core.models import Currency
 from core.permissions import TenantPermissionMixin
-from customers.models import CustomerStatement
+from core.renderers import ORJSONRenderer
+from customers.models import Customer, CustomerStatement
+from finance.models import Transaction
 from .models import Sales, SaleItem, Returns, ReturnItem
 from .serializers import (
     SaleCreateUpdateSerializer, SaleListSerializer,
@@ -18,12 +22,17 @@ from .serializers import (
     ReturnItemSerializer
 )
 from .filters import SalesFilter, ReturnsFilter
+from .cache import (
+    DASHBOARD_PERIOD_TIMEOUT, DASHBOARD_TODAY_TIMEOUT, get_or_set_dashboard,
+    get_or_set_dashboard_snapshot
+)
 
 
 class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     """ViewSet for managing sales"""
     
     permission_module = 'sales'
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = SalesFilter
     search_fields = ['sale_number', 'customer__name', 'notes']
@@ -34,13 +43,11 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         """Get filtered queryset"""
         queryset = Sales.objects.select_related(
             'customer', 'currency', 'created_by_user'
-        ).prefetch_related('items__inventory__variant__product')
-        
-        # Add annotations for better performance
-        queryset = queryset.annotate(
-            items_count=Count('items'),
         )
         
+        if self.action == 'list':
+            queryset = queryset.list_queryset()
+        
         return queryset
     
     def get_serializer_class(self):
@@ -52,64 +59,77 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """Get sales dashboard statistics"""
-        tenant = request.user.tenant
+        tenant_id = request.user.tenant_id
         today = timezone.now().date()
         week_start = today - timedelta(days=today.weekday())
         month_start = today.replace(day=1)
         
         # Base queryset
-        sales_qs = Sales.objects.filter(tenant=tenant, status='completed')
+        sales_qs = Sales.objects.for_reporting(tenant_id).filter(status='completed')
         
-        # Today's stats
-        today_sales = sales_qs.filter(sale_date__date=today).aggregate(
-            total_amount=Sum('total_amount'),
-            count=Count('id')
+        # Today's, this week's and this month's stats in a single scan
+        period_sales = get_or_set_dashboard(
+            tenant_id, 'periods', [today],
+            lambda: sales_qs.filter(sale_date__date__gte=min(week_start, month_start)).aggregate(
+                today_amount=Sum('total_amount', filter=Q(sale_date__date=today)),
+                today_count=Count('id', filter=Q(sale_date__date=today)),
+                week_amount=Sum('total_amount', filter=Q(sale_date__date__gte=week_start)),
+                week_count=Count('id', filter=Q(sale_date__date__gte=week_start)),
+                month_amount=Sum('total_amount', filter=Q(sale_date__date__gte=month_start)),
+                month_count=Count('id', filter=Q(sale_date__date__gte=month_start))
+            ),
+            DASHBOARD_TODAY_TIMEOUT
         )
         
-        # This week's stats
-        week_sales = sales_qs.filter(sale_date__date__gte=week_start).aggregate(
-            total_amount=Sum('total_amount'),
-            count=Count('id')
-        )
-        
-        # This month's stats
-        month_sales = sales_qs.filter(sale_date__date__gte=month_start).aggregate(
-            total_amount=Sum('total_amount'),
-            count=Count('id')
+        # Top selling products this month (a periodic snapshot, not invalidated by new sales)
+        top_products = get_or_set_dashboard_snapshot(
+            tenant_id, 'top_products', [month_start],
+            lambda: [
+                {
+                    'inventory__variant__product__name': row.product_name,
+                    'inventory__variant__variant_name': row.variant_name,
+                    'total_qty': row.total_qty,
+                    'total_amount': row.total_amount,
+                }
+                for row in SaleItem.objects.filter(
+                    sale__tenant_id=tenant_id,
+                    sale__status='completed',
+                    sale__sale_date__date__gte=month_start
+                ).values(
+                    product_name=F('inventory__variant__product__name'),
+                    variant_name=F('inventory__variant__variant_name')
+                ).annotate(
+                    total_qty=Sum('quantity'),
+                    total_amount=Sum('line_total')
+                ).order_by('-total_qty').values_list(
+                    'product_name', 'variant_name', 'total_qty', 'total_amount', named=True
+                )[:10]
+            ],
+            DASHBOARD_PERIOD_TIMEOUT
         )
         
-        # Top selling products this month
-        top_products = SaleItem.objects.filter(
-            sale__tenant=tenant,
-            sale__status='completed',
-            sale__sale_date__date__gte=month_start
-        ).values(
-            'variant__product__name',
-            'variant__variant_name'
-        ).annotate(
-            total_qty=Sum('quantity'),
-            total_amount=Sum('line_total')
-        ).order_by('-total_qty')[:10]
-        
-        # Recent sales
-        recent_sales = sales_qs.order_by('-sale_date')[:10]
-        recent_sales_data = SaleListSerializer(recent_sales, many=True).data
+        # Recent sales, read straight into dicts
+        recent_sales = list(sales_qs.order_by('-sale_date').values(
+            'id', 'sale_number', 'receipt_id', 'sale_date', 'total_amount', 'payment_status',
+            customer_name=F('customer__name'),
+            currency_code=F('currency__code'),
+        )[:10])
         
         return Response({
             'today': {
-                'total_amount': today_sales['total_amount'] or Decimal('0.00'),
-                'count': today_sales['count'] or 0
+                'total_amount': period_sales['today_amount'] or Decimal('0.00'),
+                'count': period_sales['today_count'] or 0
             },
             'this_week': {
-                'total_amount': week_sales['total_amount'] or Decimal('0.00'),
-                'count': week_sales['count'] or 0
+                'total_amount': period_sales['week_amount'] or Decimal('0.00'),
+                'count': period_sales['week_count'] or 0
             },
             'this_month': {
-                'total_amount': month_sales['total_amount'] or Decimal('0.00'),
-                'count': month_sales['count'] or 0
+                'total_amount': period_sales['month_amount'] or Decimal('0.00'),
+                'count': period_sales['month_count'] or 0
             },
-            'top_products': list(top_products),
-            'recent_sales': recent_sales_data
+            'top_products': top_products,
+            'recent_sales': recent_sales
         })
     
     @action(detail=False, methods=['get'])
@@ -121,8 +141,8 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         location_id = request.query_params.get('location_id')
         customer_id = request.query_params.get('customer_id')
         
-        # Build queryset
-        queryset = self.get_queryset().filter(status='completed')
+        # Build queryset (aggregate-only, so no related rows are joined or prefetched)
+        queryset = Sales.objects.for_reporting(request.user.tenant_id).filter(status='completed')
         
         if start_date:
             queryset = queryset.filter(sale_date__date__gte=start_date)
@@ -142,17 +162,20 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         )
         
         # Group by date for trends
-        daily_sales = queryset.extra(
-            select={'date': 'DATE(sale_date)'}
-        ).values('date').annotate(
-            total_amount=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('date')
+        daily_sales = queryset.annotate(
+            day=TruncDate('sale_date')
+        ).values('day').annotate(
+            amount=Sum('total_amount'),
+            sales=Count('id')
+        ).order_by('day').values_list('day', 'amount', 'sales', named=True)
         
         return Response({
             'totals': totals,
-            'daily_trends': list(daily_sales),
-            'sales_count': queryset.count()
+            'daily_trends': [
+                {'date': row.day, 'total_amount': row.amount, 'count': row.sales}
+                for row in daily_sales
+            ],
+            'sales_count': totals['count']
         })
 
     @transaction.atomic
@@ -177,7 +200,9 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         
         # Delete related financial records (e.g., voiding transactions)
         # Depending on accounting rules, you might mark these as 'void' instead of deleting
-        Transaction.objects.filter(reference_type='sale', reference_id=instance.pk).delete()
+        Transaction.objects.filter(
+            tenant_id=instance.tenant_id, reference_type='sale', reference_id=instance.pk
+        ).delete()
         
         # Finally, perform the delete
         self.perform_destroy(instance)
@@ -187,12 +212,12 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     def _reverse_inventory_for_delete(self, sale, user):
         """Return all sold items back to inventory."""
         from inventory.models import StockMovement
-        for item in sale.items.all():
-            StockMovement.objects.create(
-                tenant=sale.tenant,
-                variant=item.inventory.variant,
-                batch=item.inventory.batch,
-                location=item.inventory.location,
+        StockMovement.bulk_create_with_inventory([
+            StockMovement(
+                tenant_id=sale.tenant_id,
+                variant_id=item.inventory.variant_id,
+                batch_id=item.inventory.batch_id,
+                location_id=item.inventory.location_id,
                 movement_type='sale_cancellation',
                 quantity=item.quantity,  # Positive value returns to stock
                 reference_type='sale',
@@ -200,10 +225,12 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
                 notes=f"Cancellation of Sale: {sale.sale_number}",
                 created_by_user=user
             )
+            for item in sale.items.select_related('inventory')
+        ])
 
     def _reverse_customer_account_for_delete(self, sale, user):
         """Reverse the loan created by the sale from the customer's account."""
-        if not sale.customer:
+        if not sale.customer_id:
             return
 
         loan_statement = CustomerStatement.objects.filter(sale=sale, statement_type="loan").first()
@@ -211,8 +238,10 @@ class SalesViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
             loan_amount_base = Currency.convert_to_base_currency(
                 loan_statement.amount, loan_statement.currency_id
             )
-            sale.customer.balance += loan_amount_base
-            sale.customer.save()
+            Customer.objects.filter(pk=sale.customer_id).update(
+                balance=F('balance') + loan_amount_base,
+                updated_at=timezone.now()
+            )
             loan_statement.delete()
 
 
@@ -220,6 +249,7 @@ class ReturnsViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     """ViewSet for managing returns"""
     
     permission_module = 'sales'
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = ReturnsFilter
     search_fields = ['return_number', 'original_sale__sale_number', 'customer__name']
@@ -228,9 +258,11 @@ class ReturnsViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Get filtered queryset"""
-        return Returns.objects.select_related(
+        return Returns.objects.with_totals().select_related(
             'customer', 'original_sale', 'currency', 'processed_by_user'
-        ).prefetch_related('items__variant__product')
+        ).prefetch_related(
+            Prefetch('items', queryset=ReturnItem.objects.select_related('sale_item', 'variant__product'))
+        )
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -240,7 +272,7 @@ class ReturnsViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create return with proper tenant context"""
-        serializer.save(tenant=self.request.user.tenant)
+        serializer.save(tenant_id=self.request.user.tenant_id)
     
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
@@ -301,39 +333,33 @@ class ReturnsViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     
     def _restock_return_items(self, return_order):
         """Restock returned items to inventory"""
-        from inventory.models import Inventory, StockMovement
+        from inventory.models import StockMovement
+        
+        items = list(return_order.items.filter(
+            condition__in=['excellent', 'good'],
+            restocked=False
+        ).select_related('sale_item__inventory'))
+        
+        # Create stock movements and add the quantities back to the
+        # location each item was sold from
+        StockMovement.bulk_create_with_inventory([
+            StockMovement(
+                tenant_id=return_order.tenant_id,
+                variant_id=item.variant_id,
+                batch_id=item.batch_id,
+                location_id=item.sale_item.inventory.location_id,
+                movement_type='return',
+                quantity=item.quantity_returned,
+                reference_type='return',
+                reference_id=return_order.id,
+                notes=f"Return restocked: {return_order.return_number}",
+                created_by_user_id=return_order.processed_by_user_id
+            )
+            for item in items
+        ])
         
-        for item in return_order.items.filter(condition__in=['excellent', 'good']):
-            if not item.restocked:
-                # Add back to inventory
-                inventory, created = Inventory.objects.get_or_create(
-                    tenant=return_order.tenant,
-                    variant=item.variant,
-                    batch=item.batch,
-                    location=return_order.original_sale.location,
-                    defaults={'quantity_on_hand': 0, 'reserved_quantity': 0}
-                )
-                
-                inventory.quantity_on_hand += item.quantity_returned
-                inventory.save()
-                
-                # Create stock movement
-                StockMovement.objects.create(
-                    tenant=return_order.tenant,
-                    variant=item.variant,
-                    batch=item.batch,
-                    location=return_order.original_sale.location,
-                    movement_type='return',
-                    quantity=item.quantity_returned,
-                    reference_type='return',
-                    reference_id=return_order.id,
-                    notes=f"Return restocked: {return_order.return_number}",
-                    created_by_user=return_order.processed_by_user
-                )
-                
-                # Mark as restocked
-                item.restocked = True
-                item.save()
+        # Mark as restocked
+        ReturnItem.objects.filter(pk__in=[item.pk for item in items]).update(restocked=True)
     
     def _create_refund_payment(self, return_order):
         """Create refund payment record"""
@@ -365,5 +391,5 @@ class ReturnItemViewSet(TenantPermissionMixin, viewsets.ReadOnlyModelViewSet):
         return_id = self.kwargs.get('return_pk')
         return ReturnItem.objects.filter(
             return_order_id=return_id,
-            return_order__tenant=self.request.user.tenant
+            return_order__tenant_id=self.request.user.tenant_id
         ).select_related('variant__product', 'batch', 'sale_item')
\ No newline at end of file
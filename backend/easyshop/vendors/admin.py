@@ -1,10 +1,14 @@
 from django.contrib import admin
+from django.db.models import Count, Q
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import Vendor, Purchase, PurchaseItem
 
 
+PROGRESS_COLORS = {0: 'gray', 100: 'green'}
+
+
 @admin.register(Vendor)
 class VendorAdmin(admin.ModelAdmin):
     """Admin interface for Vendor model"""
@@ -34,7 +38,7 @@ class VendorAdmin(admin.ModelAdmin):
     
     def total_purchases_display(self, obj):
         """Display total purchases with link"""
-        count = obj.purchases.count()
+        count = obj._purchase_count
         if count > 0:
             url = reverse('admin:vendors_purchase_changelist') + f'?vendor__id__exact={obj.id}'
             return format_html('<a href="{}">{} purchases</a>', url, count)
@@ -43,8 +47,10 @@ class VendorAdmin(admin.ModelAdmin):
     total_purchases_display.short_description = 'Purchases'
     
     def get_queryset(self, request):
-        """Filter by tenant for non-superusers"""
-        qs = super().get_queryset(request)
+        """Filter by tenant for non-superusers and count purchases in the same query"""
+        qs = super().get_queryset(request).annotate(
+            _purchase_count=Count('purchases', filter=Q(purchases__deleted_at__isnull=True))
+        )
         if request.user.is_superuser:
             return qs
         return qs.filter(tenant=request.user.tenant)
@@ -112,22 +118,15 @@ class PurchaseAdmin(admin.ModelAdmin):
     def progress_display(self, obj):
         """Display receiving progress"""
         if obj.pk:
-            total_qty = obj.total_quantity
-            received_qty = obj.received_quantity
-            
-            if total_qty == 0:
-                return 'No items'
-            
-            percentage = (received_qty / total_qty) * 100
-            color = 'green' if percentage == 100 else 'orange' if percentage > 0 else 'gray'
-            
+            percentage = obj.progress_percent
             return format_html(
-                '<span style="color: {};">{}% ({}/{})</span>',
-                color, percentage, received_qty, total_qty
+                '<span style="color: {};">{}%</span>',
+                PROGRESS_COLORS.get(percentage, 'orange'), percentage
             )
         return '-'
     
     progress_display.short_description = 'Progress'
+    progress_display.admin_order_field = 'progress_percent'
     
     def get_queryset(self, request):
         """Filter by tenant for non-superusers"""
@@ -181,19 +180,15 @@ class PurchaseItemAdmin(admin.ModelAdmin):
     
     def progress_display(self, obj):
         """Display receiving progress"""
-        if obj.quantity == 0:
-            return 'No quantity'
-        
-        percentage = (obj.received_quantity / obj.quantity) * 100
-        color = 'green' if percentage == 100 else 'orange' if percentage > 0 else 'gray'
-        
+        percentage = obj.progress_percent
         return format_html(
             '<span style="color: {};">{}%</span>',
-            color, percentage
+            PROGRESS_COLORS.get(percentage, 'orange'), percentage
         )
     
     variant_display.short_description = 'Product Variant'
     progress_display.short_description = 'Progress'
+    progress_display.admin_order_field = 'progress_percent'
     
     def get_queryset(self, request):
         """Filter by tenant for non-superusers"""
@@ -11,4 +11,5 @@ class VendorsConfig(AppConfig):
     
     def ready(self):
         """Import signals when the app is ready"""
+        import vendors.signals
        
\ No newline at end of file
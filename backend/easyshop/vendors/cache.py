@@ -0,0 +1,43 @@
+# vendors/cache.py
+
+from django.core.cache import cache
+
+from core.cache import get_or_set_versioned, invalidate_versioned
+
+
+STATS_TIMEOUT = 60
+STATS_PREFIX = 'vendors:stats'
+
+
+def _purchase_sequence_key(tenant_id):
+    return f"vendors:po_seq:{tenant_id}"
+
+
+def next_purchase_sequence(tenant_id, load_last):
+    """Atomically take the tenant's next purchase sequence, seeding it from load_last() on a miss"""
+    key = _purchase_sequence_key(tenant_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        pass
+    
+    # Another writer may seed the counter first; then just increment theirs
+    seed = load_last() + 1
+    if cache.add(key, seed, None):
+        return seed
+    return cache.incr(key)
+
+
+def reset_purchase_sequence(tenant_id):
+    """Drop the cached counter so the next number is re-seeded from the database"""
+    cache.delete(_purchase_sequence_key(tenant_id))
+
+
+def get_or_set_stats(tenant_id, name, parts, compute, timeout=STATS_TIMEOUT):
+    """Return cached vendor/purchase statistics, computing and storing them on a miss"""
+    return get_or_set_versioned(STATS_PREFIX, tenant_id, name, parts, compute, timeout)
+
+
+def invalidate_stats(tenant_id):
+    """Move the tenant to a new stats version so stale entries are never read"""
+    invalidate_versioned(STATS_PREFIX, tenant_id)
@@ -1,7 +1,17 @@
+from functools import lru_cache
+
 import django_filters
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone
-from .models import  Purchase
+from core.utils import day_range, day_start
+from .models import  Purchase, PurchaseItem
+
+
+@lru_cache(maxsize=1)
+def _date_bounds(today):
+    """Week start, week end and 30-days-ago for a date, computed once per day"""
+    start_week = today - timezone.timedelta(days=today.weekday())
+    return start_week, start_week + timezone.timedelta(days=6), today - timezone.timedelta(days=30)
 
 
 class PurchaseFilter(django_filters.FilterSet):
@@ -14,6 +24,8 @@ class PurchaseFilter(django_filters.FilterSet):
     
     # Vendor filters
     vendor = django_filters.NumberFilter(field_name='vendor_id')
+    vendor_id = django_filters.NumberFilter(field_name='vendor_id')
+    location = django_filters.NumberFilter(field_name='location_id')
     vendor_name = django_filters.CharFilter(field_name='vendor__name', lookup_expr='icontains')
     vendor_code = django_filters.CharFilter(field_name='vendor__vendor_code', lookup_expr='icontains')
     
@@ -22,6 +34,8 @@ class PurchaseFilter(django_filters.FilterSet):
     payment_status = django_filters.ChoiceFilter(choices=Purchase.STATUS_CHOICES)
     
     # Date filters
+    start_date = django_filters.DateFilter(method='filter_start_date')
+    end_date = django_filters.DateFilter(method='filter_end_date')
     purchase_date_after = django_filters.DateFilter(field_name='purchase_date', lookup_expr='gte')
     purchase_date_before = django_filters.DateFilter(field_name='purchase_date', lookup_expr='lte')
     order_date_after = django_filters.DateFilter(field_name='order_date', lookup_expr='gte')
@@ -62,7 +76,8 @@ class PurchaseFilter(django_filters.FilterSet):
         model = Purchase
         fields = [
             'purchase_number', 'vendor_invoice_number', 'reference_number',
-            'vendor', 'vendor_name', 'vendor_code', 'status', 'payment_status',
+            'vendor', 'vendor_id', 'location', 'vendor_name', 'vendor_code', 'status', 'payment_status',
+            'start_date', 'end_date',
             'purchase_date_after', 'purchase_date_before', 'order_date_after', 'order_date_before',
             'expected_delivery_after', 'expected_delivery_before', 'actual_delivery_after', 'actual_delivery_before',
             'total_amount_min', 'total_amount_max', 'subtotal_min', 'subtotal_max',
@@ -71,6 +86,13 @@ class PurchaseFilter(django_filters.FilterSet):
             'last_30_days', 'contains_product'
         ]
     
+    def filter_start_date(self, queryset, name, value):
+        return queryset.filter(purchase_date__gte=day_start(value))
+    
+    def filter_end_date(self, queryset, name, value):
+        # Half-open bound so the whole end day is included
+        return queryset.filter(purchase_date__lt=day_start(value + timezone.timedelta(days=1)))
+    
     def filter_overdue(self, queryset, name, value):
         if value:
             current_date = timezone.now().date()
@@ -81,10 +103,14 @@ class PurchaseFilter(django_filters.FilterSet):
         return queryset
     
     def filter_has_received_items(self, queryset, name, value):
+        received_items = PurchaseItem.objects.filter(
+            purchase_id=OuterRef('pk'),
+            received_quantity__gt=0
+        )
         if value:
-            return queryset.filter(items__received_quantity__gt=0).distinct()
+            return queryset.filter(Exists(received_items))
         elif value is False:
-            return queryset.filter(items__received_quantity=0).distinct()
+            return queryset.filter(~Exists(received_items))
         return queryset
     
     def filter_fully_received(self, queryset, name, value):
@@ -96,10 +122,7 @@ class PurchaseFilter(django_filters.FilterSet):
     
     def filter_this_week(self, queryset, name, value):
         if value:
-            from django.utils.dates import WEEKDAYS
-            today = timezone.now().date()
-            start_week = today - timezone.timedelta(days=today.weekday())
-            end_week = start_week + timezone.timedelta(days=6)
+            start_week, end_week, _ = _date_bounds(timezone.now().date())
             return queryset.filter(
                 purchase_date__range=[start_week, end_week]
             )
@@ -107,27 +130,33 @@ class PurchaseFilter(django_filters.FilterSet):
     
     def filter_this_month(self, queryset, name, value):
         if value:
-            today = timezone.now().date()
+            today = timezone.localdate()
+            month_start = today.replace(day=1)
+            next_month = (month_start + timezone.timedelta(days=32)).replace(day=1)
             return queryset.filter(
-                purchase_date__year=today.year,
-                purchase_date__month=today.month
+                purchase_date__gte=day_start(month_start),
+                purchase_date__lt=day_start(next_month)
             )
         return queryset
     
     def filter_this_year(self, queryset, name, value):
         if value:
-            today = timezone.now().date()
-            return queryset.filter(purchase_date__year=today.year)
+            today = timezone.localdate()
+            year_start, year_end = day_range(today.replace(month=1, day=1), today.replace(month=12, day=31))
+            return queryset.filter(purchase_date__gte=year_start, purchase_date__lt=year_end)
         return queryset
     
     def filter_last_30_days(self, queryset, name, value):
         if value:
-            thirty_days_ago = timezone.now().date() - timezone.timedelta(days=30)
+            _, _, thirty_days_ago = _date_bounds(timezone.now().date())
             return queryset.filter(purchase_date__gte=thirty_days_ago)
         return queryset
     
     def filter_contains_product(self, queryset, name, value):
         if value:
-            return queryset.filter(items__product_id=value).distinct()
+            return queryset.filter(Exists(PurchaseItem.objects.filter(
+                purchase_id=OuterRef('pk'),
+                variant__product_id=value
+            )))
         return queryset
 
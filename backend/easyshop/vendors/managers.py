@@ -1,9 +1,21 @@
 # vendors/managers.py
 
+import re
+
 from django.db import models
-from django.db.models import Q, Sum, Avg, Count
+from django.db.models import (
+    F, Q, Sum, Avg, Count, Prefetch, Case, When, Value, Exists, OuterRef, Subquery, DecimalField
+)
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact, GreaterThan, LessThan
 from django.utils import timezone
+from datetime import date
 from core.managers import TenantManager
+from core.utils import day_range
+
+
+PHONE_LIKE_QUERY = re.compile(r'[+\d\s-]+')
+
 
 class VendorQuerySet(models.QuerySet):
     """Custom queryset for Vendor model"""
@@ -24,10 +36,6 @@ class VendorQuerySet(models.QuerySet):
         """Get blacklisted vendors"""
         return self.filter(status='blacklisted')
     
-    def over_credit_limit(self):
-        """Get vendors who have exceeded their credit limit"""
-        return self.extra(where=["ABS(balance) > credit_limit"])
-    
     def with_outstanding_balance(self):
         """Get vendors with outstanding payments"""
         return self.filter(balance__gt=0)
@@ -55,12 +63,15 @@ class VendorQuerySet(models.QuerySet):
         )
         
         if year:
+            # A date range rather than __year, so the purchase_date index can be used
+            year_start, year_end = day_range(date(year, 1, 1), date(year, 12, 31))
             queryset = queryset.annotate(
                 yearly_purchases=Sum(
                     'purchases__total_amount',
                     filter=Q(
                         purchases__status='completed',
-                        purchases__purchase_date__year=year
+                        purchases__purchase_date__gte=year_start,
+                        purchases__purchase_date__lt=year_end
                     )
                 )
             ).order_by('-yearly_purchases')
@@ -71,23 +82,45 @@ class VendorQuerySet(models.QuerySet):
     
     def with_recent_activity(self, days=30):
         """Get vendors with recent purchase activity"""
+        from .models import Purchase
         cutoff_date = timezone.now() - timezone.timedelta(days=days)
-        return self.filter(purchases__purchase_date__gte=cutoff_date).distinct()
+        return self.filter(Exists(Purchase.all_objects.filter(
+            vendor=OuterRef('pk'), deleted_at__isnull=True, purchase_date__gte=cutoff_date
+        )))
     
     def search(self, query):
-        """Search vendors by name, code, email, or phone"""
+        """Search vendors by name, email, phone, or tax ID"""
+        query = (query or '').strip()
         if not query:
             return self
         
+        # Phone-like input can only match the phone and tax ID columns
+        if PHONE_LIKE_QUERY.fullmatch(query):
+            return self.filter(Q(phone__icontains=query) | Q(tax_id__icontains=query))
+        
         return self.filter(
             Q(name__icontains=query) |
-            Q(vendor_code__icontains=query) |
-            Q(contact_person__icontains=query) |
             Q(email__icontains=query) |
             Q(phone__icontains=query) |
             Q(tax_id__icontains=query)
         )
     
+    def refresh_total_purchases(self):
+        """Recompute total_purchases_cached for these vendors in a single UPDATE"""
+        from .models import Purchase
+        totals = Purchase.all_objects.filter(
+            vendor=OuterRef('pk'), deleted_at__isnull=True
+        ).values('vendor').annotate(total=Sum('total_amount')).values('total')
+        return self.update(total_purchases_cached=Coalesce(
+            Subquery(totals), Value(0, output_field=DecimalField(max_digits=15, decimal_places=2))
+        ))
+    
+    def with_pending_count(self):
+        """Annotate the pending purchase count read by Vendor.pending_purchases_count"""
+        return self.annotate(_pending_purchases_count=Count('purchases', filter=Q(
+            purchases__status='pending', purchases__deleted_at__isnull=True
+        )))
+    
     def with_purchase_stats(self):
         """Annotate vendors with purchase statistics"""
         return self.annotate(
@@ -98,50 +131,69 @@ class VendorQuerySet(models.QuerySet):
         )
 
 
-class VendorManager(TenantManager):
-    """Custom manager for Vendor model"""
-    
-    def get_queryset(self):
-        return VendorQuerySet(self.model, using=self._db)
-    
-    def active(self):
-        return self.get_queryset().active()
-    
-    def inactive(self):
-        return self.get_queryset().inactive()
-    
-    def suspended(self):
-        return self.get_queryset().suspended()
-    
-    def blacklisted(self):
-        return self.get_queryset().blacklisted()
-    
-    def over_credit_limit(self):
-        return self.get_queryset().over_credit_limit()
-    
-    def with_outstanding_balance(self):
-        return self.get_queryset().with_outstanding_balance()
-    
-    def with_credit_balance(self):
-        return self.get_queryset().with_credit_balance()
-    
-    def by_rating(self, min_rating=None, max_rating=None):
-        return self.get_queryset().by_rating(min_rating=min_rating, max_rating=max_rating)
-    
-    def top_vendors_by_purchases(self, limit=10, year=None):
-        return self.get_queryset().top_vendors_by_purchases(limit=limit, year=year)
+class VendorManager(TenantManager.from_queryset(VendorQuerySet)):
+    """Tenant-scoped manager for Vendor model"""
+
+
+class PurchaseQuerySet(models.QuerySet):
+    def bare(self):
+        """Drop the default vendor/currency/location joins"""
+        return self.select_related(None)
+    
+    def for_list(self):
+        """Narrow queryset with only the columns PurchaseListSerializer reads"""
+        return self.select_related(None).select_related('vendor', 'location').only(
+            'id', 'purchase_number', 'purchase_date', 'currency_id', 'total_amount',
+            'notes', 'status', 'vendor__name', 'location__name'
+        )
     
-    def with_recent_activity(self, days=30):
-        return self.get_queryset().with_recent_activity(days=days)
+    def with_item_stats(self):
+        """Annotate purchases with their item count and ordered/received quantities"""
+        return self.annotate(
+            _total_items=Count('items'),
+            _total_quantity=Sum('items__quantity'),
+            _received_quantity=Sum('items__received_quantity'),
+        )
     
-    def search(self, query):
-        return self.get_queryset().search(query)
+    def list_rows(self):
+        """Plain dicts with the columns PurchaseListSerializer renders, item stats included"""
+        return self.with_item_stats().values(
+            'id', 'purchase_number', 'purchase_date', 'currency',
+            'total_amount', 'notes', 'status',
+            vendor_name=F('vendor__name'),
+            location_name=F('location__name'),
+            total_items=F('_total_items'),
+            total_quantity=F('_total_quantity'),
+        )
     
-    def with_purchase_stats(self):
-        return self.get_queryset().with_purchase_stats()
+    def with_items(self):
+        """Prefetch purchase items with just the columns the detail serializer reads"""
+        from .models import PurchaseItem
+        return self.prefetch_related(Prefetch(
+            'items',
+            queryset=PurchaseItem.objects.select_related('variant__product', 'batch').only(
+                'id', 'purchase_id', 'quantity', 'unit_cost', 'line_total', 'received_quantity',
+                'variant__variant_name', 'variant__barcode', 'variant__product__name',
+                'batch__batch_number'
+            )
+        ))
+    
+    def update_status_from_items(self):
+        """Set each purchase's status from its item quantities in a single UPDATE"""
+        from .models import PurchaseItem
+        items = PurchaseItem.objects.filter(purchase=OuterRef('pk')).values('purchase')
+        zero = Value(0, output_field=DecimalField(max_digits=15, decimal_places=3))
+        total = Coalesce(Subquery(items.annotate(total=Sum('quantity')).values('total')), zero)
+        received = Coalesce(Subquery(items.annotate(received=Sum('received_quantity')).values('received')), zero)
+        return self.select_related(None).update(
+            status=Case(
+                When(GreaterThan(total, 0) & Exact(total, received), then=Value('received')),
+                When(GreaterThan(received, 0) & LessThan(received, total), then=Value('partially_received')),
+                default=Value('pending'),
+            ),
+            updated_at=timezone.now()
+        )
     
-
-class PurchaseQuerySet(models.QuerySet):
     def pending(self):
         return self.filter(status='pending')
     
@@ -155,6 +207,10 @@ class PurchaseQuerySet(models.QuerySet):
         return self.filter(purchase_date__range=[start_date, end_date])
     
     def search(self, query):
+        query = (query or '').strip()
+        if not query:
+            return self
+        
         return self.filter(
             models.Q(purchase_number__icontains=query) |
             models.Q(vendor__name__icontains=query) |
@@ -162,19 +218,14 @@ class PurchaseQuerySet(models.QuerySet):
         )
 
 
-class PurchaseManager(TenantManager):
-    def get_queryset(self):
-        return PurchaseQuerySet(self.model, using=self._db)
+class PurchaseManager(TenantManager.from_queryset(PurchaseQuerySet)):
+    """
+    Tenant-scoped manager for Purchase model.
     
-    def pending(self):
-        return self.get_queryset().pending()
+    Purchase.objects.all() joins vendor, currency and location by default, so
+    str(purchase) and list serializers do not query per row. Use bare() to skip
+    the joins or for_list() for a narrow list queryset.
+    """
     
-    def received(self):
-        return self.get_queryset().received()
-    
-    def by_date_range(self, start_date, end_date):
-        return self.get_queryset().by_date_range(start_date, end_date)
-    
-    def search(self, query):
-        return self.get_queryset().search(query)
-
+    def get_queryset(self):
+        return super().get_queryset().select_related('vendor', 'currency', 'location')
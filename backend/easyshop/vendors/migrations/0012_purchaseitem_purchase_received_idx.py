@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-15 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0011_alter_vendor_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseitem',
+            index=models.Index(fields=['purchase', 'received_quantity'], name='purchase_it_purchas_abcd89_idx'),
+        ),
+    ]
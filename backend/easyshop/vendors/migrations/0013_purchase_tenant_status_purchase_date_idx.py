@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-15 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0012_purchaseitem_purchase_received_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchase',
+            name='purchases_tenant__478b33_idx',
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['tenant', 'status', 'purchase_date'], name='purchases_tenant__b584de_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.2 on 2026-10-15 12:40
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_progress(apps, schema_editor):
+    Purchase = apps.get_model('vendors', 'Purchase')
+    PurchaseItem = apps.get_model('vendors', 'PurchaseItem')
+
+    def percent(received, total):
+        if not total:
+            return 0
+        return min(int((received or 0) * 100 / total), 100)
+
+    items = list(PurchaseItem.objects.only('id', 'quantity', 'received_quantity'))
+    for item in items:
+        item.progress_percent = percent(item.received_quantity, item.quantity)
+    PurchaseItem.objects.bulk_update(items, ['progress_percent'], batch_size=500)
+
+    purchases = list(
+        Purchase.objects.annotate(
+            _total_qty=Sum('items__quantity'),
+            _received_qty=Sum('items__received_quantity')
+        ).only('id')
+    )
+    for purchase in purchases:
+        purchase.progress_percent = percent(purchase._received_qty, purchase._total_qty)
+    Purchase.objects.bulk_update(purchases, ['progress_percent'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0013_purchase_tenant_status_purchase_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='progress_percent',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='purchaseitem',
+            name='progress_percent',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-15 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('vendors', '0014_purchase_progress_percent_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='purchase',
+            name='purchase_number',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterUniqueTogether(
+            name='purchase',
+            unique_together={('tenant', 'purchase_number')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-15 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0015_alter_purchase_purchase_number_and_more'),
+    ]
+
+    operations = [
+        # Existing columns can't be altered into generated ones, so they are
+        # replaced; the database recomputes every row from its inputs.
+        migrations.RemoveField(
+            model_name='purchaseitem',
+            name='line_total',
+        ),
+        migrations.AddField(
+            model_name='purchaseitem',
+            name='line_total',
+            field=models.GeneratedField(db_persist=True, expression=models.F('quantity') * models.F('unit_cost'), output_field=models.DecimalField(decimal_places=2, max_digits=15)),
+        ),
+        migrations.RemoveField(
+            model_name='purchase',
+            name='total_amount',
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='total_amount',
+            field=models.GeneratedField(db_persist=True, expression=models.F('subtotal') + models.F('tax_amount'), output_field=models.DecimalField(decimal_places=2, max_digits=15)),
+        ),
+    ]
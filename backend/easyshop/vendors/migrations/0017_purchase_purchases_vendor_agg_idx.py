@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-15 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0016_generated_line_total_and_total_amount'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchase',
+            name='purchases_tenant__ae100b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['tenant', 'vendor', 'status', 'purchase_date'], include=['total_amount'], name='purchases_vendor_agg_idx'),
+        ),
+    ]
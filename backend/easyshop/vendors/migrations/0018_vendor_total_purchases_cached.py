@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-15 14:50
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_total_purchases(apps, schema_editor):
+    Vendor = apps.get_model('vendors', 'Vendor')
+    Purchase = apps.get_model('vendors', 'Purchase')
+
+    totals = Purchase.objects.filter(
+        vendor=OuterRef('pk'), deleted_at__isnull=True
+    ).values('vendor').annotate(total=Sum('total_amount')).values('total')
+    Vendor.objects.update(total_purchases_cached=Coalesce(
+        Subquery(totals), Value(0, output_field=DecimalField(max_digits=15, decimal_places=2))
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0017_purchase_purchases_vendor_agg_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='total_purchases_cached',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=15),
+        ),
+        migrations.RunPython(backfill_total_purchases, migrations.RunPython.noop),
+    ]
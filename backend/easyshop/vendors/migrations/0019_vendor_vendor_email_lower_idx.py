@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-15 10:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0018_vendor_total_purchases_cached'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(models.F('tenant'), django.db.models.functions.text.Lower('email'), name='vendor_email_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-15 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0019_vendor_vendor_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchase',
+            name='purchases_tenant__ac6d5a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['tenant', '-purchase_date', '-id'], name='purchases_tenant_date_id_idx'),
+        ),
+    ]
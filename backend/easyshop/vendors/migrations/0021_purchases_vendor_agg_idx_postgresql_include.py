@@ -0,0 +1,41 @@
+# Generated by Django 5.0.2 on 2026-10-15 16:55
+
+from django.db import migrations, models
+
+INDEX_COLUMNS = 'tenant_id, vendor_id, status, purchase_date'
+
+
+def add_covering_column(apps, schema_editor):
+    # Only PostgreSQL supports INCLUDE; elsewhere the plain index stays
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS purchases_vendor_agg_idx')
+    schema_editor.execute(
+        f'CREATE INDEX purchases_vendor_agg_idx ON purchases ({INDEX_COLUMNS}) INCLUDE (total_amount)'
+    )
+
+
+def remove_covering_column(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS purchases_vendor_agg_idx')
+    schema_editor.execute(f'CREATE INDEX purchases_vendor_agg_idx ON purchases ({INDEX_COLUMNS})')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0020_purchase_purchases_tenant_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchase',
+            name='purchases_vendor_agg_idx',
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['tenant', 'vendor', 'status', 'purchase_date'], name='purchases_vendor_agg_idx'),
+        ),
+        migrations.RunPython(add_covering_column, remove_covering_column),
+    ]
@@ -1,15 +1,26 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.core.validators import MinValueValidator
 from django.contrib.contenttypes.fields import GenericRelation
 from decimal import Decimal
 from core.models import TenantBaseModel, Currency, Address
 from core.threads import get_current_tenant
+from core.utils import save_with_number
+from .cache import next_purchase_sequence, reset_purchase_sequence
 from accounts.models import User
 from inventory.models import ProductBatch, ProductVariant, Location
 from vendors.utils import upload_image_path
 from .managers import VendorManager, PurchaseManager
 from django.utils import timezone
 
+
+def progress_percent(received, total):
+    """Whole receiving percentage, stored on purchases and their items"""
+    if not total:
+        return 0
+    return min(int((received or 0) * 100 / total), 100)
+
+
 class Vendor(TenantBaseModel):
     STATUS_CHOICES = [
         ('active', 'Active'),
@@ -37,6 +48,13 @@ class Vendor(TenantBaseModel):
         decimal_places=2, 
         default=Decimal('0.00')
     )
+    # Sum of the vendor's live purchase totals, kept current by Purchase.save/delete
+    total_purchases_cached = models.DecimalField(
+        max_digits=15, 
+        decimal_places=2, 
+        default=Decimal('0.00'),
+        editable=False
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     created_by_user = models.ForeignKey(
         User, 
@@ -55,6 +73,7 @@ class Vendor(TenantBaseModel):
             models.Index(fields=['tenant', 'status']),
             models.Index(fields=['tenant', 'name']),
             models.Index(fields=['tenant', 'email']),
+            models.Index(models.F('tenant'), Lower('email'), name='vendor_email_lower_idx'),
         ]
     
     def __str__(self):
@@ -62,13 +81,17 @@ class Vendor(TenantBaseModel):
     
     @property
     def total_purchases(self):
-        return self.purchases.aggregate(
-            total=models.Sum('total_amount')
-        )['total'] or Decimal('0.00')
+        return self.total_purchases_cached
     
     @property
-    def pending_purchases(self):
+    def pending_purchases_count(self):
+        if '_pending_purchases_count' in self.__dict__:
+            return self._pending_purchases_count
         return self.purchases.filter(status='pending').count()
+    
+    @property
+    def has_pending_purchases(self):
+        return self.purchases.filter(status='pending').exists()
 
 
 class Purchase(TenantBaseModel):
@@ -81,7 +104,7 @@ class Purchase(TenantBaseModel):
         ('closed', 'Closed'),
     ]
     
-    purchase_number = models.CharField(max_length=100, unique=True)
+    purchase_number = models.CharField(max_length=100)
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='purchases')
     location = models.ForeignKey(
         Location, 
@@ -104,15 +127,16 @@ class Purchase(TenantBaseModel):
         default=Decimal('0.00'),
         validators=[MinValueValidator(Decimal('0.00'))]
     )
-    total_amount = models.DecimalField(
-        max_digits=15, 
-        decimal_places=2, 
-        default=Decimal('0.00'),
-        validators=[MinValueValidator(Decimal('0.00'))]
+    # Computed by the database on every write
+    total_amount = models.GeneratedField(
+        expression=models.F('subtotal') + models.F('tax_amount'),
+        output_field=models.DecimalField(max_digits=15, decimal_places=2),
+        db_persist=True
     )
     currency = models.ForeignKey(Currency, on_delete=models.PROTECT)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     notes = models.TextField(blank=True)
+    progress_percent = models.PositiveSmallIntegerField(default=0, editable=False)
     created_by_user = models.ForeignKey(
         User, 
         on_delete=models.PROTECT, 
@@ -124,78 +148,131 @@ class Purchase(TenantBaseModel):
     class Meta:
         db_table = 'purchases'
         ordering = ['-purchase_date']
+        unique_together = ['tenant', 'purchase_number']
         indexes = [
-            models.Index(fields=['tenant', 'status']),
-            models.Index(fields=['tenant', 'purchase_date']),
-            models.Index(fields=['tenant', 'vendor']),
+            models.Index(fields=['tenant', 'status', 'purchase_date']),
+            # Seeks the keyset pages of purchase lists (newest first, id as tiebreak)
+            models.Index(fields=['tenant', '-purchase_date', '-id'], name='purchases_tenant_date_id_idx'),
+            # Serves per-vendor totals; on PostgreSQL migration 0021 rebuilds it
+            # with INCLUDE (total_amount) so the totals skip the table
+            models.Index(
+                fields=['tenant', 'vendor', 'status', 'purchase_date'],
+                name='purchases_vendor_agg_idx'
+            ),
             models.Index(fields=['purchase_number']),
         ]
     
     def __str__(self):
         return f"{self.purchase_number} - {self.vendor.name}"
     
+    # Saves touching any of these change the vendor's purchase total
+    VENDOR_TOTAL_FIELDS = {'subtotal', 'tax_amount', 'deleted_at', 'vendor'}
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored vendor so a reassignment refreshes both vendors' totals
+        instance._loaded_vendor_id = instance.__dict__.get('vendor_id')
+        return instance
+    
     def save(self, *args, **kwargs):
-        if not self.purchase_number:
-            self.purchase_number = self.generate_purchase_number()
-        super().save(*args, **kwargs)
+        if self.purchase_number:
+            super().save(*args, **kwargs)
+        else:
+            save_with_number(
+                self, 'purchase_number', self.generate_purchase_number,
+                lambda: super(Purchase, self).save(*args, **kwargs),
+                # A taken number means the cached counter is behind; re-seed it
+                on_conflict=lambda: reset_purchase_sequence(self._numbering_tenant_id())
+            )
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.VENDOR_TOTAL_FIELDS.intersection(update_fields):
+            vendor_ids = {self.vendor_id, getattr(self, '_loaded_vendor_id', None)} - {None}
+            Vendor.objects.filter(pk__in=vendor_ids).refresh_total_purchases()
+        self._loaded_vendor_id = self.vendor_id
     
-    def generate_purchase_number(self):
+    def _numbering_tenant_id(self):
+        if self.tenant_id:
+            return self.tenant_id
         tenant = get_current_tenant()
         if not tenant:
             raise ValueError("Tenant is required to generate purchase number")
+        return tenant.id
+    
+    def generate_purchase_number(self):
+        """Generate the next sequential purchase number for the tenant"""
+        tenant_id = self._numbering_tenant_id()
+        return f'PO{next_purchase_sequence(tenant_id, lambda: self._last_purchase_sequence(tenant_id)):06d}'
+    
+    @staticmethod
+    def _last_purchase_sequence(tenant_id):
+        """Sequence of the tenant's latest purchase number, or 0 if there is none"""
+        # Include soft-deleted purchases: their numbers are still unique per tenant
+        last_number = Purchase.all_objects.filter(
+            tenant_id=tenant_id
+        ).order_by('-id').values_list('purchase_number', flat=True).first()
         
-        last_purchase = Purchase.objects.filter(
-            tenant=tenant
-        ).order_by('-id').first()
-        
-        if last_purchase and last_purchase.purchase_number.startswith('PO'):
+        if last_number and last_number.startswith('PO'):
             try:
-                last_number = int(last_purchase.purchase_number[2:])
-                return f'PO{last_number + 1:06d}'
-            except (ValueError, IndexError):
+                return int(last_number[2:])
+            except ValueError:
                 pass
-        
-        return 'PO000001'
+        return 0
     
     @property
     def total_items(self):
         """Total number of different items in purchase"""
+        if '_total_items' in self.__dict__:
+            return self._total_items
         return self.items.count()
     
     @property
     def total_quantity(self):
         """Total quantity of all items"""
+        if '_total_quantity' in self.__dict__:
+            return self._total_quantity or 0
         return self.items.aggregate(
             total=models.Sum('quantity')
         )['total'] or 0
     
     @property
     def received_quantity(self):
+        if '_received_quantity' in self.__dict__:
+            return self._received_quantity or 0
         return self.items.aggregate(
             total=models.Sum('received_quantity')
         )['total'] or 0
     
+    def _item_quantities(self):
+        """Ordered and received quantities, from annotations or a single aggregate"""
+        if '_total_quantity' in self.__dict__ and '_received_quantity' in self.__dict__:
+            return self._total_quantity or 0, self._received_quantity or 0
+        totals = self.items.aggregate(
+            total=models.Sum('quantity'),
+            received=models.Sum('received_quantity')
+        )
+        return totals['total'] or 0, totals['received'] or 0
+    
     @property
     def received_percentage(self):
         """Percentage of items received"""
-        total_qty = self.total_quantity
+        total_qty, received_qty = self._item_quantities()
         if total_qty == 0:
-            return 0
+            return Decimal('0')
         
-        received_qty = self.items.aggregate(
-            total=models.Sum('received_quantity')
-        )['total'] or Decimal('0')
-        
-        return float((received_qty / total_qty) * 100)
+        return received_qty * 100 / total_qty
     
     @property
     def is_fully_received(self):
         """Check if all items are fully received"""
-        return self.total_quantity == self.received_quantity
+        total_qty, received_qty = self._item_quantities()
+        return total_qty == received_qty
     
     @property
     def is_partially_received(self):
-        return 0 < self.received_quantity < self.total_quantity
+        total_qty, received_qty = self._item_quantities()
+        return 0 < received_qty < total_qty
     
     @property
     def outstanding_amount(self):
@@ -216,24 +293,91 @@ class Purchase(TenantBaseModel):
     
     def update_status(self):
         """Update purchase status based on received quantities"""
-        if self.is_fully_received:
+        Purchase.objects.filter(pk=self.pk).update_status_from_items()
+        self.refresh_from_db(fields=['status', 'updated_at'])
+    
+    def recalc_from_items(self):
+        """Refresh totals, receiving progress and status from a single items aggregate"""
+        totals = self.items.aggregate(
+            total=models.Sum('line_total'),
+            quantity=models.Sum('quantity'),
+            received=models.Sum('received_quantity')
+        )
+        quantity = totals['quantity'] or 0
+        received = totals['received'] or 0
+        
+        self.subtotal = totals['total'] or Decimal('0.00')
+        # Mirror the generated column so this instance is current without a reload
+        self.total_amount = self.subtotal + self.tax_amount
+        self.progress_percent = progress_percent(received, quantity)
+        # A purchase with no items has nothing received yet
+        if quantity > 0 and quantity == received:
             self.status = 'received'
-        elif self.is_partially_received:
+        elif 0 < received < quantity:
             self.status = 'partially_received'
-        # elif self.status == 'received' or self.status == 'partially_received':
         else:
             self.status = 'pending'
-        self.save()
+        self.save(update_fields=['subtotal', 'progress_percent', 'status', 'updated_at'])
+    
+    def receive_lines(self, receipts, user=None, movement_type='purchase', items=None):
+        """Receive several items at once; receipts is a list of (item_id, quantity) pairs.
+        Pass items (an id -> PurchaseItem dict) when they are already loaded."""
+        if items is None:
+            items = self.items.in_bulk([item_id for item_id, _ in receipts])
+        self._apply_receipts(items, receipts, user, movement_type)
     
-    def calculate_totals(self):
-        """Recalculate purchase totals based on items"""
-        items_total = self.items.aggregate(
-            total=models.Sum('line_total')
-        )['total'] or Decimal('0.00')
+    def receive_outstanding(self, user=None, movement_type='purchase'):
+        """Receive every item's outstanding quantity, loading (and locking) the items once"""
+        with transaction.atomic():
+            items = {item.pk: item for item in self.items.select_for_update()}
+            self._apply_receipts(items, [
+                (item.pk, item.quantity - item.received_quantity)
+                for item in items.values()
+                if item.quantity > item.received_quantity
+            ], user, movement_type)
+    
+    def _apply_receipts(self, items, receipts, user, movement_type):
+        """Validate receipts against the loaded items, then write them in bulk"""
+        from inventory.models import StockMovement
         
-        self.subtotal = items_total
-        self.total_amount = self.subtotal + self.tax_amount
-        self.save()
+        received = []
+        for item_id, quantity in receipts:
+            item = items.get(item_id)
+            if item is None:
+                raise ValueError(f"Purchase item with id {item_id} not found")
+            if quantity <= 0:
+                raise ValueError("Quantity must be positive")
+            if item.received_quantity + quantity > item.quantity:
+                raise ValueError("Cannot receive more than ordered quantity")
+            item.received_quantity += quantity
+            item.progress_percent = progress_percent(item.received_quantity, item.quantity)
+            received.append((item, quantity))
+        
+        if not received:
+            return
+        
+        user_id = user.id if user else self.created_by_user_id
+        with transaction.atomic():
+            PurchaseItem.objects.bulk_update(
+                list({item.pk: item for item, _ in received}.values()),
+                ['received_quantity', 'progress_percent']
+            )
+            StockMovement.bulk_create_with_inventory([
+                StockMovement(
+                    tenant_id=self.tenant_id,
+                    variant_id=item.variant_id,
+                    batch_id=item.batch_id,
+                    location_id=self.location_id,
+                    movement_type=movement_type,
+                    quantity=quantity,
+                    reference_type='purchase',
+                    reference_id=self.id,
+                    notes=f"Received from purchase {self.purchase_number}",
+                    created_by_user_id=user_id
+                )
+                for item, quantity in received
+            ])
+            self.recalc_from_items()
 
 
 class PurchaseItem(models.Model):
@@ -260,10 +404,11 @@ class PurchaseItem(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(Decimal('0.01'))]
     )
-    line_total = models.DecimalField(
-        max_digits=15, 
-        decimal_places=2,
-        validators=[MinValueValidator(Decimal('0.00'))]
+    # Computed by the database on every write
+    line_total = models.GeneratedField(
+        expression=models.F('quantity') * models.F('unit_cost'),
+        output_field=models.DecimalField(max_digits=15, decimal_places=2),
+        db_persist=True
     )
     received_quantity = models.DecimalField(
         max_digits=10, 
@@ -271,23 +416,37 @@ class PurchaseItem(models.Model):
         default=Decimal('0.000'),
         validators=[MinValueValidator(Decimal('0.000'))]
     )
+    progress_percent = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'purchase_items'
         indexes = [
             models.Index(fields=['purchase', 'variant']),
+            models.Index(fields=['purchase', 'received_quantity']),
         ]
     
     def __str__(self):
         return f"{self.purchase.purchase_number} - {self.variant.product.name}"
     
-    def save(self, *args, **kwargs):
-        self.line_total = self.quantity * self.unit_cost
+    def save(self, *args, recalc=True, **kwargs):
+        """Save the item; pass recalc=False when the caller refreshes the purchase once itself"""
+        self.progress_percent = progress_percent(self.received_quantity, self.quantity)
         super().save(*args, **kwargs)
         # Update purchase totals
-        self.purchase.calculate_totals()
-        self.purchase.update_status()
+        if recalc:
+            self.purchase.recalc_from_items()
+    
+    @classmethod
+    def bulk_create_for_purchase(cls, purchase, items, batch_size=500):
+        """Create a purchase's items in bulk and refresh the purchase once"""
+        # bulk_create skips save(), so fill the derived columns here
+        for item in items:
+            item.purchase = purchase
+            item.progress_percent = progress_percent(item.received_quantity, item.quantity)
+        items = cls.objects.bulk_create(items, batch_size=batch_size)
+        purchase.recalc_from_items()
+        return items
     
     @property
     def remaining_quantity(self):
@@ -307,10 +466,10 @@ class PurchaseItem(models.Model):
     def receipt_percentage(self):
         """Percentage of item received"""
         if self.quantity == 0:
-            return 0
-        return float((self.received_quantity / self.quantity) * 100)
+            return Decimal('0')
+        return self.received_quantity * 100 / self.quantity
     
-    def receive_quantity(self, quantity):
+    def receive_quantity(self, quantity, recalc=True):
         """Receive a specific quantity and update inventory"""
         if quantity <= 0:
             raise ValueError("Quantity must be positive")
@@ -319,20 +478,21 @@ class PurchaseItem(models.Model):
             raise ValueError("Cannot receive more than ordered quantity")
         
         self.received_quantity += quantity
-        self.save()
+        self.save(recalc=recalc)
         
         # Update inventory
         from inventory.models import StockMovement
         
+        # Pass ids so receiving many lines doesn't fetch each related row
         StockMovement.objects.create(
-            tenant=self.purchase.tenant,
-            variant=self.variant,
-            batch=self.batch,
-            location=self.purchase.location,
+            tenant_id=self.purchase.tenant_id,
+            variant_id=self.variant_id,
+            batch_id=self.batch_id,
+            location_id=self.purchase.location_id,
             movement_type='purchase',
             quantity=quantity,
             reference_type='purchase',
-            reference_id=self.purchase.id,
+            reference_id=self.purchase_id,
             notes=f"Received from purchase {self.purchase.purchase_number}",
-            created_by_user=self.purchase.created_by_user
+            created_by_user_id=self.purchase.created_by_user_id
         )
\ No newline at end of file
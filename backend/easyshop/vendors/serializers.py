@@ -1,21 +1,60 @@
 from rest_framework import serializers
 from decimal import Decimal
+from django.db.models import F, Q
 from django.utils import timezone
 
-from catalog.utils import check_barcode, generate_barcode
+from catalog.utils import generate_barcodes
 from .models import Vendor, Purchase, PurchaseItem
 from core.models import Currency
 from catalog.models import ProductVariant, Product, ProductPrice
-from inventory.models import ProductBatch, Inventory, StockMovement
+from inventory.models import ProductBatch, VariantBatchCounter
 from django.db import IntegrityError, transaction
 from core.threads import get_current_tenant
-from finance.models import Transaction, Payment
+from core.serializers import AddressSerializer
+from finance.models import Transaction, Payment, CashDrawerMoney
+
+
+RECENT_PURCHASE_STATUSES = ('pending', 'received')
+
+# (current, new) purchase status changes PurchaseDetailSerializer rejects
+INVALID_STATUS_TRANSITIONS = frozenset({
+    ('received', 'draft'),
+    ('received', 'pending'),
+    ('cancelled', 'received'),
+    ('cancelled', 'partially_received'),
+})
+ORDER_CONFIRMATION_STATUSES = frozenset({'pending', 'ordered', 'approved'})
+RECEIPT_STATUSES = frozenset({'partially_received', 'received'})
+
+
+def validate_vendor_unique(attrs, instance=None):
+    """Check vendor email and name uniqueness in one query"""
+    email = attrs.get('email')
+    name = attrs.get('name')
+    lookup = Q(pk__in=[])
+    if email:
+        lookup |= Q(email__iexact=email)
+    if name:
+        lookup |= Q(name=name)
+    vendors = Vendor.objects.filter(lookup)
+    if instance is not None:
+        vendors = vendors.exclude(pk=instance.pk)
+
+    errors = {}
+    for vendor_email, vendor_name in vendors.values_list('email', 'name'):
+        if email and vendor_email.lower() == email.lower():
+            errors['email'] = "Vendor with this email already exists."
+        if name and vendor_name == name:
+            errors['name'] = f"{name} Already Exists"
+    if errors:
+        raise serializers.ValidationError(errors)
+    return attrs
 
 
 class VendorListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for vendor listings"""
     total_purchases = serializers.ReadOnlyField()
-    pending_purchases = serializers.ReadOnlyField()
+    pending_purchases = serializers.ReadOnlyField(source='pending_purchases_count')
     created_by_name = serializers.CharField(source='created_by_user.get_full_name', read_only=True)
     photo = serializers.SerializerMethodField()
     class Meta:
@@ -32,6 +71,16 @@ class VendorListSerializer(serializers.ModelSerializer):
         if obj.photo:
             return request.build_absolute_uri(obj.photo.url)
         return ""
+
+
+class OverdueVendorSerializer(VendorListSerializer):
+    """Vendor listing annotated with the amount of its overdue purchases"""
+    total_overdue = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+
+    class Meta(VendorListSerializer.Meta):
+        fields = VendorListSerializer.Meta.fields + ['total_overdue']
+
+
 class VendorDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for vendor CRUD operations"""
     created_by_name = serializers.CharField(source='created_by_user.get_full_name', read_only=True)
@@ -49,30 +98,19 @@ class VendorDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['balance', 'created_by_name', 'created_at', 'updated_at', 'status']
     
     def get_addresses(self, obj):
-        from core.serializers import AddressSerializer
         addresses = obj.addresses.all()
         return AddressSerializer(addresses, many=True).data
     
     def get_recent_purchases(self, obj):
-        recent_purchases = obj.purchases.filter(
-            status__in=['pending', 'received']
+        # Join vendor and location but load only the columns PurchaseListSerializer
+        # reads, and annotate the item stats so it doesn't aggregate per row
+        recent_purchases = obj.purchases.for_list().with_item_stats().filter(
+            status__in=RECENT_PURCHASE_STATUSES
         ).order_by('-purchase_date')[:5]
         return PurchaseListSerializer(recent_purchases, many=True).data
 
-    def validate_email(self, value):
-        if value:
-            existing = Vendor.objects.filter(
-            email__iexact=value
-            )
-            if existing.exists():
-                raise serializers.ValidationError("Vendor with this email already exists.")
-        return value
-
-    def validate_name(self, name):
-        vendors = Vendor.objects.filter(name=name)
-        if vendors.exists():
-            raise serializers.ValidationError(f"{name} Already Exists")
-        return name    
+    def validate(self, attrs):
+        return validate_vendor_unique(attrs, self.instance)
     
     
 class VendorUpdateSerializer(serializers.ModelSerializer):
@@ -86,14 +124,8 @@ class VendorUpdateSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "balance", "photo"]
         
-    def validate_email(self, value):
-        if value:
-            existing = Vendor.objects.filter(
-                email__iexact=value
-            ).exclude(pk=self.instance.pk)
-            if existing.exists():
-                raise serializers.ValidationError("Vendor with this email already exists.")
-        return value
+    def validate(self, attrs):
+        return validate_vendor_unique(attrs, self.instance)
 
 
 # Create Purchase
@@ -103,7 +135,7 @@ class ProductVariantCreateSerializer(serializers.Serializer):
     variant_name = serializers.CharField(max_length=255, required=False, allow_blank=True)
     image = serializers.ImageField(required=False, allow_null=True)
     is_default = serializers.BooleanField(default=False)
-    
+    barcode = serializers.CharField(max_length=100, required=False, allow_blank=True)
     
     # Pricing fields (required for default variant)
     cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
@@ -111,15 +143,6 @@ class ProductVariantCreateSerializer(serializers.Serializer):
     selling_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
     selling_currency_id = serializers.IntegerField(required=False)
 
-    def validate_barcode(self, barcode):
-        if barcode:
-            try:
-                if not check_barcode(barcode):
-                    raise serializers.ValidationError(f"barcode: {barcode} already exists")
-            except:
-                pass
-        return barcode
-
 
 class ProductCreateSerializer(serializers.Serializer):
     """Serializer for creating new products within purchase"""
@@ -157,10 +180,17 @@ class ProductCreateSerializer(serializers.Serializer):
             if not (variant.get("variant_name") or variant.get("is_default")):
                 raise serializers.ValidationError(f"non-Default variant must have variant_name")
         
-            # Validate barcodes
-            variant_barcode = variant.get('barcode')
-            if not check_barcode(variant_barcode):
-                raise serializers.ValidationError(f"barcode: {variant_barcode} already exists")
+        # Validate barcodes with one query for all variants
+        barcodes = [v['barcode'] for v in value if v.get('barcode')]
+        if barcodes:
+            clashes = set(ProductVariant.objects.filter(
+                tenant=get_current_tenant(), barcode__in=barcodes
+            ).values_list('barcode', flat=True))
+            clashes.update(b for b in barcodes if barcodes.count(b) > 1)
+            if clashes:
+                raise serializers.ValidationError(
+                    f"barcode: {', '.join(sorted(clashes))} already exists"
+                )
         return value
 
 
@@ -237,67 +267,78 @@ class PurchaseCreateSerializer(serializers.ModelSerializer):
             
             purchase = Purchase.objects.create(**validated_data)
             
-            # Process each item
-            subtotal = Decimal('0')
-            for item_data in items_data:
-                line_total = self._process_purchase_item(purchase, item_data, user)
-                subtotal += line_total
+            # Existing variants are checked in one query instead of one per item
+            existing_variant_ids = set(ProductVariant.objects.filter(
+                tenant=tenant,
+                id__in=[item_data['variant_id'] for item_data in items_data if item_data.get('variant_id')]
+            ).values_list('id', flat=True))
+            prices = []
             
-            # Update purchase totals
-            purchase.subtotal = subtotal
-            purchase.total_amount = subtotal + (purchase.tax_amount or Decimal('0'))
-            purchase.save()
+            # Build each item and batch without writing, then insert them in bulk
+            built = [
+                self._process_purchase_item(
+                    purchase, item_data, user, tenant, existing_variant_ids, prices
+                )
+                for item_data in items_data
+            ]
+            
+            # New variants have no current price yet, so ProductPrice.save's
+            # "retire the previous current price" step has nothing to do
+            ProductPrice.objects.bulk_create(prices)
+            batches = [batch for _, batch in built if batch]
+            self._assign_batch_numbers(batches)
+            ProductBatch.objects.bulk_create(batches)
+            items = []
+            for item, batch in built:
+                if batch:
+                    item.batch = batch
+                items.append(item)
+            
+            # Insert items and update purchase totals once
+            PurchaseItem.bulk_create_for_purchase(purchase, items)
             
             self._process_payment(payment, purchase)
             
             return purchase
     
-    def _process_purchase_item(self, purchase, item_data, user):
-        """Process individual purchase item - create product/variant if needed"""
-        from .models import PurchaseItem
-        tenant = get_current_tenant()
-        
+    def _process_purchase_item(self, purchase, item_data, user, tenant, existing_variant_ids, prices):
+        """Build an unsaved purchase item and batch - create product/variant if needed"""
         if item_data.get('variant_id'):
             # Existing product variant
             variant_id = item_data['variant_id']
-            variant = ProductVariant.objects.get(id=variant_id, tenant=tenant)
+            if variant_id not in existing_variant_ids:
+                raise serializers.ValidationError(f"Product variant with id {variant_id} not found")
         else:
             # Create new product and variants
-            variant = self._create_product_and_variants(item_data['product_data'], user, tenant)
+            variant = self._create_product_and_variants(item_data['product_data'], user, tenant, prices)
             variant_id = variant.id
         
-        # Handle batch creation if expiry date provided
-        batch_id = None
+        # Handle batch creation if expiry date provided (saved in bulk by the caller)
+        batch = None
         if item_data.get('expiry_date'):
-            batch = ProductBatch.objects.create(
+            batch = ProductBatch(
                 tenant=tenant,
                 variant_id=variant_id,
-                batch_number=item_data.get('batch_number') or self._generate_batch_number(variant_id),
+                batch_number=item_data.get('batch_number'),
                 expiry_date=item_data['expiry_date'],
                 supplier_batch_ref=item_data.get('supplier_batch_ref', ''),
                 is_active=True
             )
-            batch_id = batch.id
-        
-        # Create purchase item
-        quantity = item_data['quantity']
-        unit_cost = item_data['unit_cost']
-        line_total = quantity * unit_cost
         
-        PurchaseItem.objects.create(
+        # Build purchase item (saved in bulk by the caller)
+        item = PurchaseItem(
             purchase=purchase,
             variant_id=variant_id,
-            batch_id=batch_id,
-            quantity=quantity,
-            unit_cost=unit_cost,
-            line_total=line_total,
+            quantity=item_data['quantity'],
+            unit_cost=item_data['unit_cost'],
             received_quantity=Decimal('0')
         )
-        
-        return line_total
+        return item, batch
     
-    def _create_product_and_variants(self, product_data, user, tenant):
+    def _create_product_and_variants(self, product_data, user, tenant, prices):
         """Create new product with variants and pricing"""
+        variants = product_data['variants']
+        
         # Create product
         try:
             product = Product.objects.create(
@@ -307,7 +348,7 @@ class PurchaseCreateSerializer(serializers.ModelSerializer):
                 base_unit_id=product_data['base_unit_id'],
                 description=product_data.get('description', ''),
                 reorder_level=product_data.get('reorder_level', 0),
-                has_variants=len(product_data['variants']) > 1,
+                has_variants=len(variants) > 1,
                 is_active=True,
                 created_by_user=user
             )
@@ -315,38 +356,46 @@ class PurchaseCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"Product Name must be unique: name: {product_data['name']} is duplicated")
             
         default_variant = None
+        # One clock read per product; the index keeps SKUs unique within it
+        now = timezone.now()
+        ts = now.strftime('%Y%m%d%H%M%S')
         
-        # Create variants
-        for variant_data in product_data['variants']:
-
+        # Barcodes for variants submitted without one, generated together
+        given_barcodes = [v['barcode'] for v in variants if v.get('barcode')]
+        new_barcodes = iter(generate_barcodes(len(variants) - len(given_barcodes), given_barcodes))
+        
+        # Build variants, then insert them in one statement. The product is new,
+        # so ProductVariant.save's "one default per product" update has nothing to do
+        new_variants = []
+        for idx, variant_data in enumerate(variants):
+            is_default = variant_data['is_default']
             variant_name = variant_data.get('variant_name')
 
-            barcode = variant_data.pop('barcode', '')
+            barcode = variant_data.pop('barcode', '') or next(new_barcodes)
             
-            if not barcode:
-                barcode = generate_barcode()
-            
-            if variant_data['is_default']:
+            if is_default:
                 variant_name = product.name  # Default variant uses product name
             
-            try:
-                variant = ProductVariant.objects.create(
-                    tenant=tenant,
-                    product=product,
-                    barcode=barcode,
-                    sku=self._generate_sku(product.name, variant_name),
-                    variant_name=variant_name,
-                    image=variant_data.get('image'),
-                    is_default=variant_data['is_default'],
-                    is_active=True
-                )            
-                
-            except IntegrityError as e:
-                raise serializers.ValidationError({"error": "Barcode must be Unique"})
-            
-            # Create pricing for variant (required for default, optional for others)
+            new_variants.append(ProductVariant(
+                tenant=tenant,
+                product=product,
+                barcode=barcode,
+                sku=self._generate_sku(product.name, variant_name, ts, idx),
+                variant_name=variant_name,
+                image=variant_data.get('image'),
+                is_default=is_default,
+                is_active=True
+            ))
+        
+        try:
+            ProductVariant.objects.bulk_create(new_variants)
+        except IntegrityError as e:
+            raise serializers.ValidationError({"error": "Barcode must be Unique"})
+        
+        for variant, variant_data in zip(new_variants, variants):
+            # Pricing for variant (required for default, optional for others), saved in bulk
             if variant_data.get('cost_price') and variant_data.get('selling_price'):
-                ProductPrice.objects.create(
+                prices.append(ProductPrice(
                     tenant=tenant,
                     variant=variant,
                     product=product,
@@ -354,33 +403,42 @@ class PurchaseCreateSerializer(serializers.ModelSerializer):
                     cost_currency_id=variant_data['cost_currency_id'],
                     selling_price=variant_data['selling_price'],
                     selling_currency_id=variant_data['selling_currency_id'],
-                    effective_date=timezone.now(),
+                    effective_date=now,
                     is_current=True,
                     created_by_user=user
-                )
+                ))
             
-            if variant_data['is_default']:
+            if variant.is_default:
                 default_variant = variant
         
         return default_variant
     
-    def _generate_sku(self, product_name, variant_name):
-        """Generate SKU from product and variant names"""
+    def _generate_sku(self, product_name, variant_name, ts, idx):
+        """Generate SKU from product and variant names, timestamp and variant index"""
         base = f"{product_name[:3].upper()}-{variant_name[:3].upper() if variant_name else 'DEF'}"
-        return f"{base}-{timezone.now().strftime('%Y%m%d%H%M%S')}"
-    
-    def _generate_batch_number(self, variant_id):
-        """Generate batch number for variant"""
-        count = ProductBatch.objects.filter(variant_id=variant_id).count()
-        return f"BATCH-{variant_id}-{count + 1:04d}"
+        return f"{base}-{ts}-{idx:03d}"
+    
+    def _assign_batch_numbers(self, batches):
+        """Number batches submitted without one, reserving one block of sequence values per variant"""
+        unnumbered = {}
+        for batch in batches:
+            if not batch.batch_number:
+                unnumbered.setdefault(batch.variant_id, []).append(batch)
+        
+        for variant_id, variant_batches in unnumbered.items():
+            last = VariantBatchCounter.reserve(variant_id, len(variant_batches))
+            first = last - len(variant_batches) + 1
+            for seq, batch in enumerate(variant_batches, start=first):
+                batch.batch_number = f"BATCH-{variant_id}-{seq:04d}"
 
     def _process_payment(self, payment, purchase: Purchase):
         payment_method = payment.get("method")
         if payment_method == "cash":
             payment_currency_id = payment.get("currency")
-            try:
-                payment_currency = Currency.objects.get(id=payment_currency_id)
-            except:
+            payment_currency_code = Currency.objects.filter(
+                pk=payment_currency_id
+            ).values_list('code', flat=True).first()
+            if not payment_currency_code:
                 raise serializers.ValidationError("Invalid Currency")
             
             payment_amount = purchase.currency.convert_to(purchase.total_amount, payment_currency_id)
@@ -394,7 +452,7 @@ class PurchaseCreateSerializer(serializers.ModelSerializer):
                 reference_type='purchase',
                 reference_id=purchase.id,
                 cash_drawer_id=payment_cash_drawer_id,
-                notes=f"{payment_amount} {payment_currency.code} Payment For purchase: {purchase.purchase_number}",
+                notes=f"{payment_amount} {payment_currency_code} Payment For purchase: {purchase.purchase_number}",
                 created_by_user=purchase.created_by_user
             )
             
@@ -414,28 +472,24 @@ class PurchaseCreateSerializer(serializers.ModelSerializer):
             )
             
             # Update cash drawer if specified
-            from finance.models import CashDrawerMoney
-            drawer_money, created = CashDrawerMoney.objects.get_or_create(
-                cash_drawer_id=payment_cash_drawer_id,
-                currency_id=payment_currency_id,
-                defaults={'amount': Decimal('0')}
-            )
-            drawer_money.amount -= payment_amount
-            drawer_money.save()
+            CashDrawerMoney.adjust(payment_cash_drawer_id, payment_currency_id, -payment_amount)
             
             return payment
 
         elif payment_method == "loan":
-            vendor = purchase.vendor
             base_purchase_amount = Currency.convert_to_base_currency(purchase.total_amount, purchase.currency_id)
-            vendor.balance += base_purchase_amount
-            vendor.save()
+            Vendor.objects.filter(pk=purchase.vendor_id).update(
+                balance=F('balance') + base_purchase_amount,
+                updated_at=timezone.now()
+            )
     
             
 class PurchaseItemSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='variant.variant_name')
     barcode = serializers.CharField(source='variant.barcode')
     currency = serializers.IntegerField(source='purchase.currency_id')
+    line_total = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    
     class Meta:
         model = PurchaseItem
         fields = [
@@ -448,6 +502,7 @@ class PurchaseListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for purchase listings"""
     vendor_name = serializers.CharField(source='vendor.name', read_only=True)
     location_name = serializers.CharField(source='location.name', read_only=True)
+    total_amount = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
     total_items = serializers.ReadOnlyField()
     total_quantity = serializers.ReadOnlyField()
     
@@ -460,10 +515,29 @@ class PurchaseListSerializer(serializers.ModelSerializer):
         ]
 
 
+def iter_purchase_list(rows):
+    """Render Purchase.objects.list_rows() dicts as PurchaseListSerializer would,
+    formatting only the date and amount instead of binding every field per row"""
+    fields = PurchaseListSerializer().fields
+    purchase_date, total_amount = fields['purchase_date'], fields['total_amount']
+    for row in rows:
+        item = {name: row[name] for name in PurchaseListSerializer.Meta.fields}
+        item['purchase_date'] = purchase_date.to_representation(row['purchase_date'])
+        item['total_amount'] = total_amount.to_representation(row['total_amount'])
+        item['total_quantity'] = row['total_quantity'] or 0
+        yield item
+
+
+def serialize_purchase_list(rows):
+    """List form of iter_purchase_list for paginated responses"""
+    return list(iter_purchase_list(rows))
+
+
 class PurchaseDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for purchase CRUD operations"""
     vendor_name = serializers.CharField(source='vendor.name', read_only=True)
     location_name = serializers.CharField(source='location.name', read_only=True)
+    total_amount = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
     items = PurchaseItemSerializer(many=True, read_only=True)
     total_items = serializers.ReadOnlyField()
     total_quantity = serializers.ReadOnlyField()
@@ -482,6 +556,11 @@ class PurchaseDetailSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load everything this serializer reads: related names, item stats and narrow items"""
+        return queryset.select_related('vendor', 'location', 'currency').with_item_stats().with_items()
+    
     def validate(self, data):
         """Validate purchase data"""
         purchase_date = data.get('purchase_date')
@@ -498,16 +577,10 @@ class PurchaseDetailSerializer(serializers.ModelSerializer):
             current_status = self.instance.status
             new_status = data.get('status', current_status)
             
-            invalid_transitions = {
-                'received': ['draft', 'pending'],
-                'cancelled': ['received', 'partially_received']
-            }
-            
-            if current_status in invalid_transitions:
-                if new_status in invalid_transitions[current_status]:
-                    raise serializers.ValidationError(
-                        f"Cannot change status from {current_status} to {new_status}"
-                    )
+            if (current_status, new_status) in INVALID_STATUS_TRANSITIONS:
+                raise serializers.ValidationError(
+                    f"Cannot change status from {current_status} to {new_status}"
+                )
         
         return data
 
@@ -533,17 +606,20 @@ class ReceiveItemsSerializer(serializers.Serializer):
         purchase = self.context['purchase']
         
         for item_data in items_data:
-            item_id = item_data.get('item_id')
-            quantity = item_data.get('quantity')
-            
-            if not item_id or not quantity:
+            if not item_data.get('item_id') or not item_data.get('quantity'):
                 raise serializers.ValidationError(
                     "Each item must have item_id and quantity"
                 )
+        
+        # Load every referenced item in one query; save() reuses them
+        self._items = purchase.items.in_bulk([int(d['item_id']) for d in items_data])
+        receiving = {}
+        for item_data in items_data:
+            item_id = int(item_data['item_id'])
+            quantity = item_data['quantity']
+            item = self._items.get(item_id)
             
-            try:
-                item = purchase.items.get(id=item_id)
-            except PurchaseItem.DoesNotExist:
+            if item is None:
                 raise serializers.ValidationError(
                     f"Purchase item with id {item_id} not found"
                 )
@@ -551,7 +627,8 @@ class ReceiveItemsSerializer(serializers.Serializer):
             if quantity <= 0:
                 raise serializers.ValidationError("Quantity must be positive")
             
-            if item.received_quantity + quantity > item.quantity:
+            receiving[item_id] = receiving.get(item_id, Decimal('0')) + quantity
+            if item.received_quantity + receiving[item_id] > item.quantity:
                 raise serializers.ValidationError(
                     f"Cannot receive more than ordered quantity for item {item_id}"
                 )
@@ -563,9 +640,9 @@ class ReceiveItemsSerializer(serializers.Serializer):
         purchase = self.context['purchase']
         items_data = self.validated_data['items']
         
-        for item_data in items_data:
-            item = purchase.items.get(id=item_data['item_id'])
-            item.receive_quantity(item_data['quantity'])
+        purchase.receive_lines([
+            (int(item_data['item_id']), item_data['quantity']) for item_data in items_data
+        ], items=self._items)
         
         return purchase
 
@@ -617,11 +694,11 @@ class PurchaseUpdateSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         
         # Status: draft -> pending/ordered
-        if old_status == 'draft' and new_status in ['pending', 'ordered', 'approved']:
+        if old_status == 'draft' and new_status in ORDER_CONFIRMATION_STATUSES:
             self._handle_order_confirmation(purchase, user)
         
         # Status: * -> partially_received/received
-        elif new_status in ['partially_received', 'received']:
+        elif new_status in RECEIPT_STATUSES:
             self._handle_receipt(purchase, user)
         
         # Status: * -> cancelled
@@ -647,39 +724,8 @@ class PurchaseUpdateSerializer(serializers.ModelSerializer):
     
     def _handle_receipt(self, purchase, user):
         """Handle inventory receipt - update stock levels"""
-        for item in purchase.items.all():
-            # Update inventory
-            inventory, created = Inventory.objects.get_or_create(
-                tenant=purchase.tenant,
-                variant=item.variant,
-                batch=item.batch,
-                location=purchase.location,
-                defaults={'quantity_on_hand': Decimal('0')}
-            )
-            
-            # Determine received quantity (for now, assume full receipt)
-            received_qty = item.quantity - item.received_quantity
-            if received_qty > 0:
-                inventory.quantity_on_hand += received_qty
-                inventory.save()
-                
-                # Update received quantity
-                item.received_quantity += received_qty
-                item.save()
-                
-                # Create stock movement
-                StockMovement.objects.create(
-                    tenant=purchase.tenant,
-                    variant=item.variant,
-                    batch=item.batch,
-                    location=purchase.location,
-                    movement_type='purchase_receipt',
-                    quantity=received_qty,
-                    reference_type='purchase',
-                    reference_id=purchase.id,
-                    notes=f"Received from Purchase {purchase.purchase_number}",
-                    created_by_user=user
-                )
+        # Receive every outstanding quantity (for now, assume full receipt)
+        purchase.receive_outstanding(user=user, movement_type='purchase_receipt')
     
     def _handle_cancellation(self, purchase, user):
         """Handle purchase cancellation - reverse any reservations"""
@@ -751,13 +797,9 @@ class PurchaseUpdateSerializer(serializers.ModelSerializer):
             
 #             # Update cash drawer if specified
 #             if validated_data.get('cash_drawer_id'):
-#                 from finance.models import CashDrawerMoney
-#                 drawer_money, created = CashDrawerMoney.objects.get_or_create(
-#                     cash_drawer_id=validated_data['cash_drawer_id'],
-#                     currency_id=validated_data['currency_id'],
-#                     defaults={'amount': Decimal('0')}
+#                 CashDrawerMoney.adjust(
+#                     validated_data['cash_drawer_id'], validated_data['currency_id'],
+#                     -validated_data['amount']
 #                 )
-#                 drawer_money.amount -= validated_data['amount']
-#                 drawer_money.save()
             
 #             return payment
@@ -0,0 +1,23 @@
+# vendors/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_stats
+from .models import Purchase, Vendor
+
+
+@receiver([post_save, post_delete], sender=Purchase)
+@receiver([post_save, post_delete], sender=Vendor)
+def invalidate_vendor_stats(sender, instance, **kwargs):
+    """Drop cached vendor and purchase statistics when a tenant's data changes"""
+    invalidate_stats(instance.tenant_id)
+
+
+@receiver(post_delete, sender=Purchase)
+def refresh_vendor_total(sender, instance, **kwargs):
+    """Refresh the vendor's cached purchase total on every hard delete.
+    Queryset deletes (e.g. the admin's "delete selected") skip Purchase.delete but
+    still send post_delete. Queryset update() calls send nothing, so they must call
+    refresh_total_purchases() themselves."""
+    Vendor.objects.filter(pk=instance.vendor_id).refresh_total_purchases()
@@ -3,6 +3,7 @@
 from celery import shared_task
 from django.utils import timezone
 from datetime import timedelta
+from .cache import invalidate_stats
 from .models import Purchase
 
 
@@ -11,16 +12,18 @@ def auto_close_received_purchases():
     """Automatically close purchases that have been fully received for 30 days"""
     cutoff_date = timezone.now() - timedelta(days=30)
     
-    purchases_to_close = Purchase.objects.filter(
+    # Status doesn't feed Purchase.save's side effects (numbering, vendor
+    # totals), so a single UPDATE replaces the per-row save loop
+    to_close = Purchase.objects.filter(
         status='received',
         updated_at__lte=cutoff_date
     )
+    tenant_ids = set(to_close.values_list('tenant_id', flat=True).distinct())
+    closed_count = to_close.update(status='closed', updated_at=timezone.now())
     
-    closed_count = 0
-    for purchase in purchases_to_close:
-        purchase.status = 'closed'
-        purchase.save()
-        closed_count += 1
+    # update() skips post_save, which is what normally drops cached stats
+    for tenant_id in tenant_ids:
+        invalidate_stats(tenant_id)
     
     return f"Closed {closed_count} purchases"
 
@@ -0,0 +1,88 @@
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from core.models import Tenant, Currency
+from inventory.models import Location
+from .models import Vendor, Purchase
+
+
+class PurchaseListEndpointTests(TestCase):
+    """Purchase list endpoints render values() rows through iter_purchase_list"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Shop', contact_email='shop@example.com', status='active')
+        location = Location.objects.create(tenant=self.tenant, name='Main', address='Main street')
+        user = User.objects.create_superuser(
+            username='owner', email='owner@example.com', password='secret',
+            tenant=self.tenant, location=location
+        )
+        currency = Currency.objects.create(tenant=self.tenant, name='US Dollar', code='USD')
+        self.vendor = Vendor.objects.create(tenant=self.tenant, name='Acme', email='acme@example.com')
+        Purchase.objects.create(
+            tenant=self.tenant, vendor=self.vendor, location=location, currency=currency,
+            subtotal=Decimal('100.00'), tax_amount=Decimal('5.00'),
+            status='pending', created_by_user=user
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def get(self, url):
+        return self.client.get(url, HTTP_X_TENANT_ID=str(self.tenant.id))
+
+    def test_purchase_list(self):
+        response = self.get('/api/vendors/purchases/')
+        self.assertEqual(response.status_code, 200)
+        purchase = response.json()['results'][0]
+        self.assertEqual(purchase['total_amount'], '105.00')
+        self.assertEqual(purchase['vendor_name'], 'Acme')
+
+    def test_pending_purchases(self):
+        response = self.get('/api/vendors/purchases/pending/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['total_amount'], '105.00')
+
+    def test_vendor_purchases_stream(self):
+        response = self.get(f'/api/vendors/vendors/{self.vendor.id}/purchases/')
+        self.assertEqual(response.status_code, 200)
+        purchases = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(purchases[0]['total_amount'], '105.00')
+
+
+class VendorPurchaseTotalTests(TestCase):
+    """Vendor.total_purchases_cached follows purchases between vendors"""
+
+    def setUp(self):
+        tenant = Tenant.objects.create(name='Shop', contact_email='shop@example.com', status='active')
+        location = Location.objects.create(tenant=tenant, name='Main', address='Main street')
+        user = User.objects.create_user(
+            username='buyer', email='buyer@example.com', password='secret',
+            tenant=tenant, location=location
+        )
+        currency = Currency.objects.create(tenant=tenant, name='US Dollar', code='USD')
+        self.first = Vendor.objects.create(tenant=tenant, name='Acme', email='acme@example.com')
+        self.second = Vendor.objects.create(tenant=tenant, name='Globex', email='globex@example.com')
+        self.purchase = Purchase.objects.create(
+            tenant=tenant, vendor=self.first, location=location, currency=currency,
+            subtotal=Decimal('40.00'), status='pending', created_by_user=user
+        )
+
+    def assertTotals(self, first, second):
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.total_purchases_cached, Decimal(first))
+        self.assertEqual(self.second.total_purchases_cached, Decimal(second))
+
+    def test_vendor_change(self):
+        purchase = Purchase.objects.get(pk=self.purchase.pk)
+        purchase.vendor = self.second
+        purchase.save()
+        self.assertTotals('0', '40.00')
+
+    def test_queryset_delete(self):
+        Purchase.objects.filter(pk=self.purchase.pk).delete()
+        self.assertTotals('0', '0')
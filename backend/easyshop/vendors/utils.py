@@ -1,10 +1,17 @@
  
 import os
-import uuid
+import secrets
+from functools import lru_cache
 from django.utils.text import slugify
 from core.threads import get_current_tenant
 
 
+@lru_cache(maxsize=128)
+def _tenant_slug(tenant_id, tenant_name):
+    """Slugified tenant name; the id is part of the key so renamed tenants get a fresh slug"""
+    return slugify(tenant_name)
+
+
 def upload_image_path(instance, filename, folder_name='uploads', instance_field_name='name', name=None):
     """
     Generate a readable and unique file path for uploaded images.
@@ -17,7 +24,7 @@ def upload_image_path(instance, filename, folder_name='uploads', instance_field_
 
     # Get Tenant
     tenant = get_current_tenant()
-    sanitized_tenant_name = slugify(tenant.name)
+    sanitized_tenant_name = _tenant_slug(tenant.id, tenant.name)
 
     # Try to get a meaningful name from the instance (fallback to model name)
     if not name:
@@ -26,10 +33,10 @@ def upload_image_path(instance, filename, folder_name='uploads', instance_field_
     sanitized_name = slugify(name)
 
     # Generate short unique hash
-    unique_hash = uuid.uuid4().hex[:6]
+    unique_hash = secrets.token_hex(3)
 
     # Final filename
     filename = f"{sanitized_name}-{unique_hash}{ext}"
 
     # Directory based on model
-    return os.path.join(sanitized_tenant_name, folder_name, filename)
+    return f"{sanitized_tenant_name}/{folder_name}/{filename}"
@@ -1,11 +1,14 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Avg, F, OuterRef, Subquery, DecimalField
-from django.db.models.functions import Coalesce
+from django.db.models import Sum, Avg, Count, F, Q, Exists, OuterRef, Subquery, DecimalField
+from django.db.models.functions import Coalesce, Round
 from django.utils import timezone
-from datetime import datetime
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from datetime import date
 from decimal import Decimal
 from inventory.models import Location
 from core.models import CurrencyRate
@@ -14,30 +17,51 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from .models import Vendor, Purchase, PurchaseItem
 from .serializers import (
     PurchaseDetailSerializer, VendorListSerializer, VendorDetailSerializer, PurchaseListSerializer,
-    PurchaseCreateSerializer, PurchaseUpdateSerializer, PurchaseItemCreateSerializer,
+    PurchaseCreateSerializer, PurchaseUpdateSerializer, PurchaseItemCreateSerializer, PurchaseItemSerializer,
     ReceiveItemsSerializer, VendorStatsSerializer, PurchaseStatsSerializer,
-    PurchasePaymentSerializer, VendorUpdateSerializer
+    PurchasePaymentSerializer, VendorUpdateSerializer, OverdueVendorSerializer,
+    serialize_purchase_list, iter_purchase_list
 )
 from core.permissions import TenantPermissionMixin
-from core.pagination import StandardResultsSetPagination
+from core.renderers import ORJSONRenderer, loads as json_loads
+from core.utils import day_range, day_start, month_start, stream_json_array
+from core.pagination import PurchaseCursorPagination
 from .filters import PurchaseFilter
+from .cache import get_or_set_stats, invalidate_stats
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 
+SINGLE_PURCHASE_LIST_ACTIONS = ('receive_items', 'mark_received', 'cancel', 'approve')
+
+
+def purchase_list_response(view, queryset):
+    """Paginate purchases and render them through the values() fast path.
+    Unpaginated results are streamed so the full list is never held in memory."""
+    rows = queryset.list_rows()
+    page = view.paginate_queryset(rows)
+    if page is not None:
+        return view.get_paginated_response(serialize_purchase_list(page))
+    return StreamingHttpResponse(
+        stream_json_array(iter_purchase_list(rows.iterator(chunk_size=500))),
+        content_type='application/json'
+    )
+
+
 class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing purchases
     Provides CRUD operations, search, filtering, and receiving functionality
     """
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
     permission_module = 'purchases'
-    filter_backends = [DjangoFilterBackend, DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = PurchaseFilter
-    filterset_fields = ['status', 'vendor', 'location', 'created_by_user']
     search_fields = ['purchase_number', 'vendor__name', 'notes']
     ordering_fields = ['purchase_date', 'total_amount', 'status']
-    ordering = ['-purchase_date']
-    pagination_class = StandardResultsSetPagination
+    # id breaks purchase_date ties so the cursor position is stable
+    ordering = ['-purchase_date', '-id']
+    pagination_class = PurchaseCursorPagination
     
     
     def get_serializer_class(self):
@@ -50,35 +74,28 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         return PurchaseListSerializer
     
     def get_queryset(self):
+        # Query-string filters (status, vendor_id, start_date, ...) live in PurchaseFilter
         queryset = Purchase.objects.all()
-
-        # Filter by status
-        status_filter = self.request.query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Filter by vendor
-        vendor_id = self.request.query_params.get('vendor_id')
-        if vendor_id:
-            queryset = queryset.filter(vendor_id=vendor_id)
-        
-        # Filter by date range
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            queryset = queryset.filter(purchase_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(purchase_date__lte=end_date)
-        
-        return queryset.select_related('vendor', 'location', 'currency', 'created_by_user'
-                                       ).prefetch_related('items__variant__product')
+        
+        # Only the detail serializer renders items
+        if self.action == 'retrieve':
+            queryset = PurchaseDetailSerializer.setup_eager_loading(queryset)
+        # Single-purchase actions answer with PurchaseListSerializer; their changes
+        # never alter ordered quantities, so stats fetched up front stay accurate
+        elif self.action in SINGLE_PURCHASE_LIST_ACTIONS:
+            queryset = queryset.with_item_stats()
+        
+        # PurchaseManager already joins vendor, location and currency
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        return purchase_list_response(self, self.filter_queryset(self.get_queryset()))
     
    
     from django.core.handlers.wsgi import WSGIRequest
     def create(self, request: WSGIRequest, *args, **kwargs):
-        import json
         if request.headers.get("Content-Type") != "application/json":
-            items = json.loads(request.data.get("items", '[]'))
+            items = json_loads(request.data.get("items", '[]'))
 
             for i, item in enumerate(items):
                 if "product_data" in item:
@@ -92,7 +109,7 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
                 "currency": request.data["currency"],
                 "notes": request.data.get("notes", ""),
                 "items": items,
-                "payment": json.loads(request.data.get("payment"))
+                "payment": json_loads(request.data.get("payment"))
             }
 
             serializer = self.get_serializer(data=payload)
@@ -106,31 +123,34 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get purchase statistics"""
-        queryset = self.get_queryset()
-        
-        stats = {
-            'total_purchases': queryset.count(),
-            'pending_purchases': queryset.filter(status='pending').count(),
-            'received_purchases': queryset.filter(status='received').count(),
-        }
-        
-        # Calculate amounts
-        amounts = queryset.aggregate(
+        # PurchaseFilter reads the query string, so it is part of the key
+        return Response(get_or_set_stats(
+            request.user.tenant_id, 'purchases', [request.get_full_path()], self._purchase_stats
+        ))
+    
+    def _purchase_stats(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        this_month_start = month_start()
+        
+        # Counts and amounts in a single query
+        agg = queryset.aggregate(
+            total_purchases=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            received=Count('id', filter=Q(status='received')),
             total=Sum('total_amount'),
-            average=Avg('total_amount')
+            average=Avg('total_amount'),
+            this_month=Sum('total_amount', filter=Q(purchase_date__gte=this_month_start)),
         )
-        stats['total_amount'] = amounts['total'] or Decimal('0.00')
-        stats['average_purchase_value'] = amounts['average'] or Decimal('0.00')
-        
-        # This month's purchases
-        now = timezone.now()
-        this_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        stats['this_month_amount'] = queryset.filter(
-            purchase_date__gte=this_month_start
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
+        stats = {
+            'total_purchases': agg['total_purchases'],
+            'pending_purchases': agg['pending'],
+            'received_purchases': agg['received'],
+            'total_amount': agg['total'] or Decimal('0.00'),
+            'average_purchase_value': agg['average'] or Decimal('0.00'),
+            'this_month_amount': agg['this_month'] or Decimal('0.00'),
+        }
         
-        serializer = PurchaseStatsSerializer(stats)
-        return Response(serializer.data)
+        return PurchaseStatsSerializer(stats).data
     
     @action(detail=True, methods=['post'])
     def receive_items(self, request, pk=None):
@@ -184,14 +204,10 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
             )
         
         purchase.location = location
-        purchase.save()
-        # Receive all remaining quantities
-        for item in purchase.items.all():
-            remaining = item.remaining_quantity
-            if remaining > 0:
-                item.receive_quantity(remaining)
-        
-        purchase.refresh_from_db()
+        purchase.save(update_fields=['location', 'updated_at'])
+        # Receive all remaining quantities in one batch
+        purchase.receive_outstanding()
+        
         serializer = self.get_serializer(purchase)
         return Response(serializer.data)
     
@@ -225,14 +241,22 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if purchase.received_quantity > 0:
+        # Re-check both conditions in the UPDATE itself so a concurrent receipt
+        # or status change can't slip in between the check and the write
+        cancelled = Purchase.objects.filter(pk=purchase.pk).exclude(
+            status__in=['received', 'cancelled']
+        ).exclude(
+            items__received_quantity__gt=0
+        ).update(status='cancelled', updated_at=timezone.now())
+        if not cancelled:
             return Response(
                 {'error': 'Cannot cancel a purchase with received items'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        # update() skips post_save, which is what normally drops cached stats
+        invalidate_stats(purchase.tenant_id)
         
         purchase.status = 'cancelled'
-        purchase.save()
         
         serializer = self.get_serializer(purchase)
         return Response(serializer.data)
@@ -242,20 +266,22 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         """Approve a draft purchase"""
         purchase = self.get_object()
         
-        if purchase.status != 'draft':
-            return Response(
-                {'error': 'Only draft purchases can be approved'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        if not purchase.items.exists():
-            return Response(
-                {'error': 'Cannot approve purchase without items'},
-                status=status.HTTP_400_BAD_REQUEST
+        # Status and item checks ride along in the UPDATE; only a failed
+        # approval pays for a follow-up read to pick the error message
+        approved = Purchase.objects.filter(pk=purchase.pk, status='draft').filter(
+            Exists(PurchaseItem.objects.filter(purchase=OuterRef('pk')))
+        ).update(status='pending', updated_at=timezone.now())
+        if not approved:
+            current_status = Purchase.objects.filter(pk=purchase.pk).values_list('status', flat=True).first()
+            error = (
+                'Only draft purchases can be approved' if current_status != 'draft'
+                else 'Cannot approve purchase without items'
             )
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        # update() skips post_save, which is what normally drops cached stats
+        invalidate_stats(purchase.tenant_id)
         
         purchase.status = 'pending'
-        purchase.save()
         
         serializer = self.get_serializer(purchase)
         return Response(serializer.data)
@@ -263,32 +289,20 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get pending purchases"""
-        queryset = self.get_queryset().filter(status='pending')
+        queryset = self.filter_queryset(self.get_queryset()).filter(status='pending')
         
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = PurchaseListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = PurchaseListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return purchase_list_response(self, queryset)
     
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue purchases (delivery date passed)"""
         today = timezone.now().date()
-        queryset = self.get_queryset().filter(
+        queryset = self.filter_queryset(self.get_queryset()).filter(
             status__in=['pending', 'partially_received'],
             delivery_date__lt=today
         )
         
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = PurchaseListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = PurchaseListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return purchase_list_response(self, queryset)
     
     @action(detail=False, methods=['get'])
     def by_date_range(self, request):
@@ -303,32 +317,35 @@ class PurchaseViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
             )
         
         try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            date.fromisoformat(start_date)
+            date.fromisoformat(end_date)
         except ValueError:
             return Response(
                 {'error': 'Invalid date format. Use YYYY-MM-DD'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        queryset = self.get_queryset().filter(
-            purchase_date__date__range=[start_date, end_date]
-        )
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = PurchaseListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = PurchaseListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        # PurchaseFilter applies start_date/end_date as a half-open day range
+        return purchase_list_response(self, self.filter_queryset(self.get_queryset()))
 
 
-class PurchaseItemViewSet(TenantPermissionMixin, viewsets.ViewSet):
+class PurchaseItemViewSet(TenantPermissionMixin, viewsets.GenericViewSet):
     """
     ViewSet for managing purchase items
     """
     permission_module = 'purchases'
+    serializer_class = PurchaseItemSerializer
+    
+    def get_queryset(self):
+        # receive_quantity reads the purchase and the serializer reads the variant
+        queryset = PurchaseItem.objects.filter(
+            purchase__deleted_at__isnull=True
+        ).select_related('purchase', 'variant')
+        # PurchaseItem has no tenant column, so scope through the purchase
+        # the same way TenantPermissionMixin scopes tenant models
+        if not self.request.user.is_superuser:
+            queryset = queryset.filter(purchase__tenant_id=self.request.user.tenant_id)
+        return queryset
     
     @action(detail=True, methods=['post'])
     def receive(self, request, pk=None):
@@ -371,15 +388,19 @@ class VendorViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     
     # This line enables the ViewSet to accept JSON, form-data, and file uploads
     parser_classes = [MultiPartParser, FormParser, JSONParser] 
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'created_by_user']
-    search_fields = ['name', 'contact_person', 'email', 'phone']
+    search_fields = ['name', 'email', 'phone', 'tax_id']
     ordering_fields = ['name', 'balance', 'created_at']
     ordering = ['name']
     
     def get_queryset(self):
-        return Vendor.objects.select_related('created_by_user').prefetch_related('addresses')
+        queryset = Vendor.objects.select_related('created_by_user').prefetch_related('addresses')
+        if self.action in ('list', 'overdue_purchases'):
+            queryset = queryset.with_pending_count()
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -392,31 +413,35 @@ class VendorViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='vendors-stats')
     def vendors_stats(self, request):
         """Get vendor statistics"""
+        return Response(get_or_set_stats(
+            request.user.tenant_id, 'vendors', [], self._vendors_stats
+        ))
+    
+    def _vendors_stats(self):
         queryset = self.get_queryset()
+        this_month_start = month_start()
         
+        # One query for vendor counts, one for purchase statistics
+        vendor_agg = queryset.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            inactive=Count('id', filter=Q(status='inactive')),
+        )
+        purchase_agg = Purchase.objects.filter(vendor__in=queryset).aggregate(
+            total=Sum('total_amount'),
+            pending=Count('id', filter=Q(status='pending')),
+            this_month=Sum('total_amount', filter=Q(purchase_date__gte=this_month_start)),
+        )
         stats = {
-            'total_vendors': queryset.count(),
-            'active_vendors': queryset.filter(status='active').count(),
-            'inactive_vendors': queryset.filter(status='inactive').count(),
+            'total_vendors': vendor_agg['total'],
+            'active_vendors': vendor_agg['active'],
+            'inactive_vendors': vendor_agg['inactive'],
+            'total_purchases_amount': purchase_agg['total'] or Decimal('0.00'),
+            'pending_purchases': purchase_agg['pending'],
+            'this_month_purchases': purchase_agg['this_month'] or Decimal('0.00'),
         }
         
-        # Calculate purchase statistics
-        purchases = Purchase.objects.filter(vendor__in=queryset)
-        stats['total_purchases_amount'] = purchases.aggregate(
-            total=Sum('total_amount')
-        )['total'] or Decimal('0.00')
-        
-        stats['pending_purchases'] = purchases.filter(status='pending').count()
-        
-        # This month's purchases
-        now = timezone.now()
-        this_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        stats['this_month_purchases'] = purchases.filter(
-            purchase_date__gte=this_month_start
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0.00')
-        
-        serializer = VendorStatsSerializer(stats)
-        return Response(serializer.data)
+        return VendorStatsSerializer(stats).data
     
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
@@ -425,6 +450,11 @@ class VendorViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         all converted to the base currency.
         """
         vendor = self.get_object()
+        return Response(get_or_set_stats(
+            request.user.tenant_id, 'vendor', [vendor.pk], lambda: self._vendor_stats(vendor)
+        ))
+    
+    def _vendor_stats(self, vendor):
 
         # 1. Define a subquery to find the latest applicable currency rate for each purchase item.
         # This is the core optimization to avoid the N+1 query problem.
@@ -450,29 +480,27 @@ class VendorViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
             # Group the results by variant name.
             'variant__variant_name'
         ).annotate(
-            # Sum the quantities and base currency costs for each group.
+            # Sum the quantities and base currency costs for each group,
+            # rounding in the database.
             total_quantity=Sum('quantity'),
-            total_amount=Sum('base_currency_cost')
+            total_amount=Round(Sum('base_currency_cost'), 2)
         )
 
-        # 3. Format the result list and calculate the grand total.
-        # This is now a simple data transformation, as the heavy lifting is done.
-        statistics_result = [
-            {
+        # 3. Format the result list and accumulate the grand total in the same pass.
+        statistics_result = []
+        total_vendor_amount = Decimal('0')
+        for item in variant_stats:
+            statistics_result.append({
                 "name": item["variant__variant_name"],
                 "total_quantity": item["total_quantity"],
-                "total_amount": round(item["total_amount"], 2)
-            }
-            for item in variant_stats
-        ]
+                "total_amount": item["total_amount"]
+            })
+            total_vendor_amount += item["total_amount"]
 
-        # The total amount is now a simple sum of the pre-calculated variant totals.
-        total_vendor_amount = sum(item['total_amount'] for item in statistics_result)
-
-        return Response({
+        return {
             "statistics": statistics_result,
             "total_amount": round(total_vendor_amount, 2)
-        })
+        }
     
     @action(detail=True, methods=['patch'], parser_classes=[MultiPartParser, FormParser])
     def photo(self, request, pk=None):
@@ -503,21 +531,16 @@ class VendorViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
         if status_filter:
             purchases = purchases.filter(status=status_filter)
         
-        date_from = request.query_params.get('date_from')
-        date_to = request.query_params.get('date_to')
+        date_from = parse_date(request.query_params.get('date_from') or '')
+        date_to = parse_date(request.query_params.get('date_to') or '')
         if date_from and date_to:
+            range_start, range_end = day_range(date_from, date_to)
             purchases = purchases.filter(
-                purchase_date__date__range=[date_from, date_to]
+                purchase_date__gte=range_start, purchase_date__lt=range_end
             )
         
         # Paginate
-        page = self.paginate_queryset(purchases)
-        if page is not None:
-            serializer = PurchaseListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = PurchaseListSerializer(purchases, many=True)
-        return Response(serializer.data)
+        return purchase_list_response(self, purchases)
     
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
@@ -543,20 +566,19 @@ class VendorViewSet(TenantPermissionMixin, viewsets.ModelViewSet):
     def overdue_purchases(self, request):
         """Get vendors with overdue purchases"""
         today = timezone.now().date()
-        overdue_purchases = Purchase.objects.filter(
-            status__in=['pending', 'partially_received'],
-            delivery_date__lt=today
-        ).values('vendor').annotate(
-            total_overdue=Sum('total_amount')
-        ).order_by('-total_overdue')
-        
-        # Get vendor details
-        vendors = Vendor.objects.filter(id__in=[v['vendor'] for v in overdue_purchases])
+        # Overdue totals and vendor details in one query, largest first
+        vendors = self.get_queryset().annotate(
+            total_overdue=Sum('purchases__total_amount', filter=Q(
+                purchases__status__in=['pending', 'partially_received'],
+                purchases__delivery_date__lt=day_start(today),
+                purchases__deleted_at__isnull=True,
+            ))
+        ).filter(total_overdue__gt=0).order_by('-total_overdue')
         
         page = self.paginate_queryset(vendors)
         if page is not None:
-            serializer = VendorListSerializer(page, many=True)
+            serializer = OverdueVendorSerializer(page, many=True, context=self.get_serializer_context())
             return self.get_paginated_response(serializer.data)
         
-        serializer = VendorListSerializer(vendors, many=True)
+        serializer = OverdueVendorSerializer(vendors, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
\ No newline at end of file